@@ -8,6 +8,7 @@ Integrates with RagEngine for Retrieval-Augmented Generation and sends responses
 Logging configuration is managed using the setup_logger utility.
 """
 import os
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from webexteamssdk import WebexTeamsAPI
 from dotenv import load_dotenv
@@ -18,14 +19,23 @@ from prometheus_client import (
     CONTENT_TYPE_LATEST
     )
 from fastapi import FastAPI, Request
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from logger.logger import setup_logger
-from services.generate_response import get_response
+from services.generate_response import get_response, stream_response
+from services.modelbase import LLMModel
 from api.utils import get_config_with_session
 
 logger = setup_logger('api_router', 'log/api_router.log')
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Load the LLM into Ollama while the service starts, instead of on the first question.
+    """
+    LLMModel.get_instance().warmup()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 api = WebexTeamsAPI(access_token=os.getenv("WEBEX_TOKEN"))
 
 # Prometheus metrics
@@ -100,6 +110,40 @@ async def invoke_model(request: Query, session_id="default_session"):
             logger.error("RuntimeError during /invoke handling: %s", e, exc_info=True)
             return {"error": "Internal processing error."}
 
+@app.post("/invoke/stream")
+async def invoke_model_stream(request: Query, session_id="default_session"):
+    """
+    Endpoint to invoke the RAG model and stream the answer tokens as plain text.
+
+    Args:
+        request (Query): The input query wrapped in a Pydantic model.
+
+    Returns:
+        StreamingResponse: Tokens of the generated response as they arrive.
+    """
+    REQUEST_COUNT.labels(endpoint="/invoke/stream", method="POST").inc()
+    config = get_config_with_session(session_id)
+    state = {
+        "query": request.query,
+        "context": "",
+        "response": "",
+        "messages": [],
+        "summary": "",
+        "user_name": ""
+    }
+    logger.info("POST /invoke/stream received with query: %s", state["query"])
+
+    async def token_stream():
+        try:
+            async for token in stream_response(state, config):
+                yield token
+        except RuntimeError as e:
+            ERROR_COUNT.labels(endpoint="/invoke/stream", error_type="RuntimeError").inc()
+            logger.error("RuntimeError during /invoke/stream handling: %s", e, exc_info=True)
+            yield "Internal processing error."
+
+    return StreamingResponse(token_stream(), media_type="text/plain")
+
 @app.post("/webexhook")
 async def webhook(request: Request):
     """
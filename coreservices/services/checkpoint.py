@@ -0,0 +1,12 @@
+import os
+from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
+
+mongouri = os.getenv("MONGO_URI")
+
+def open_checkpointer():
+    """Async context manager for the MongoDB checkpointer that holds conversation state per thread_id."""
+    return AsyncMongoDBSaver.from_conn_string(conn_string=mongouri,
+                                              db_name="chatdata",
+                                              checkpoint_collection_name="checkpoints",
+                                              writes_collection_name="checkpoint_writes",
+                                              )
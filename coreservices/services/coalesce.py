@@ -0,0 +1,51 @@
+"""
+Collapses concurrent identical requests so only one of them does the work.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive key for a user query."""
+    return " ".join(query.lower().split())
+
+
+class RequestCoalescer:
+    """
+    In-flight request map: the first caller for a key runs the function,
+    callers arriving while it is still running wait on the same future.
+    """
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func for key, or wait for the identical call already in flight.
+
+        Args:
+            key (str): Identity of the request.
+            func (Callable): Function doing the work.
+
+        Returns:
+            Any: The result of func, shared by all concurrent callers.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        if not is_leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -1,12 +1,9 @@
-import os
 import asyncio
 from dotenv import load_dotenv
-from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
+from services.checkpoint import open_checkpointer
 from services.langgraphtool import State
 from services.langgraph_builder import create_graph
 
-mongouri = os.getenv("MONGO_URI")
-
 async def get_response(state: State, config):
     """functino to generate response
     args:
@@ -14,13 +11,23 @@ async def get_response(state: State, config):
     config: uid for thread"""
     graph_builder = create_graph()
     try:
-        async with AsyncMongoDBSaver.from_conn_string(conn_string=mongouri,
-                                                      db_name="chatdata",
-                                                      checkpoint_collection_name="checkpoints",
-                                                      writes_collection_name="checkpoint_writes",
-                                                      ) as checkpointer:
+        async with open_checkpointer() as checkpointer:
             graph = graph_builder.compile(checkpointer=checkpointer)
             output_generated = await graph.ainvoke(state,config=config)
             return output_generated['response']
     except Exception as e:
         raise RuntimeError(f"Error running conversation workflow: {str(e)}") from e
+
+async def stream_response(state: State, config):
+    """function to stream response tokens as the model generates them
+    args:
+    state: message state
+    config: uid for thread"""
+    graph_builder = create_graph()
+    try:
+        async with open_checkpointer() as checkpointer:
+            graph = graph_builder.compile(checkpointer=checkpointer)
+            async for token in graph.astream(state, config=config, stream_mode="custom"):
+                yield token
+    except Exception as e:
+        raise RuntimeError(f"Error running conversation workflow: {str(e)}") from e
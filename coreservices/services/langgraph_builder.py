@@ -3,13 +3,11 @@ from langgraph.graph import StateGraph, START, END
 from services.langgraphtool import (
     State,
     smalltalk_node,
-    summarize_conversation,
     route_by_intent,
     rag_invoke_node,
     extract_name_node,
     start_node,
     tool_node,
-    should_summarize,
     connector_node
     )
 
@@ -21,7 +19,6 @@ def create_graph():
     graph_builder.add_node("tool", tool_node)
     graph_builder.add_node("rag_invoke_node", rag_invoke_node)
     graph_builder.add_node("smalltalk", smalltalk_node)
-    graph_builder.add_node("summarize_conversation", summarize_conversation)
     graph_builder.add_node("connector_node", connector_node)
     graph_builder.add_node("end", lambda state: state)
 
@@ -31,8 +28,7 @@ def create_graph():
     graph_builder.add_edge("tool", "rag_invoke_node")
     graph_builder.add_edge("rag_invoke_node", "connector_node")
     graph_builder.add_edge("smalltalk", "connector_node")
-    graph_builder.add_conditional_edges("connector_node", should_summarize, ['summarize_conversation', END])
-    graph_builder.add_edge("summarize_conversation", END)
+    graph_builder.add_edge("connector_node", END)
 
     return graph_builder
 
@@ -1,9 +1,14 @@
 import re
-from typing import TypedDict, Annotated, List
+import asyncio
+import logging
+from typing import TypedDict, Annotated, List, Set
 from langchain.schema import HumanMessage, AIMessage, BaseMessage
 from langchain_core.messages import RemoveMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph.message import add_messages
 from langgraph.graph import END
+from services.checkpoint import open_checkpointer
 from services.tools import Tools
 from services.websearch import WebSearch
 from logger.logger import setup_logger
@@ -14,6 +19,18 @@ web_search = WebSearch()
 
 tl = Tools()
 
+# Summarize once the history grows past SUMMARY_THRESHOLD, keeping the last KEEP_LAST messages
+SUMMARY_THRESHOLD = 6
+KEEP_LAST = 4
+
+# Short queries shortly after a technical turn are treated as follow-ups to it
+FOLLOWUP_MAX_WORDS = 6
+FOLLOWUP_MAX_TURNS = 2
+
+# Thread ids with a background summary in progress in this process
+_summaries_running: Set[str] = set()
+_background_tasks = set()
+
 class State(TypedDict):
     """
     State dictionary for conversation flow in the graph.
@@ -24,10 +41,17 @@ class State(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
     summary: str
     user_name: str
+    turn: int
+    last_intent: str
+    last_intent_turn: int
+
+def _thread_id(config: RunnableConfig) -> str:
+    return (config or {}).get("configurable", {}).get("thread_id", "default_session")
 
 def start_node(state: State):
     """
     Initializes or continues the message history with role-aware messages.
+    A summary written back in the background after an earlier turn is already part of the state.
 
     Args:
         state (State): The current state.
@@ -36,20 +60,27 @@ def start_node(state: State):
         dict: Updated state with initialized fields.
     """
     logger.info("start_node called with query: %s", state.get('query', ''))
+    messages = state.get("messages", [])
+    summary = state.get("summary", "")
     result = {
         "query": state["query"],
-        "messages": state.get("messages", []),
+        "messages": messages,
         "context": "",
-        "summary": state.get("summary", ""),
+        "summary": summary,
         "response": "",
-        "user_name": state.get("user_name", "")
+        "user_name": state.get("user_name", ""),
+        "turn": state.get("turn", 0) + 1
     }
-    logger.debug("start_node result: %s", result)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("start_node result: turn=%d, %d messages, summary length %d",
+                     result["turn"], len(result["messages"]), len(result["summary"]))
     return result
 
-def tool_node(state: State):
+async def tool_node(state: State):
     """
-    Retrieves context for the query using the retrieval tool.
+    Retrieves context for the query using the retrieval tool and web search.
+    The top-K chunks are fetched from the RAG service while the web search's
+    LLM call is still generating, instead of after it.
 
     Args:
         state (State): The current state.
@@ -58,18 +89,24 @@ def tool_node(state: State):
         dict: Updated state with retrieved context.
     """
     logger.info("tool_node called with query: %s", state.get('query', ''))
-    context_web = web_search.modelcall(state["query"])
-    context_vectorsearch = tl.retrieval_tool(state["query"])
+    context_vectorsearch, context_web = await asyncio.gather(
+        asyncio.to_thread(tl.retrieval_tool, state["query"]),
+        asyncio.to_thread(web_search.modelcall, state["query"]),
+    )
     context = context_vectorsearch+context_web
-    logger.debug("tool_node retrieved context: %s", context)
+    logger.debug("tool_node retrieved context of length %d", len(context))
     result = {
         "query": state["query"],
         "context": context,
         "messages": state["messages"],
         "summary": state.get("summary", ""),
         "response": state.get("response", ""),
+        "last_intent": "tool",
+        "last_intent_turn": state.get("turn", 0),
     }
-    logger.debug("tool_node result: %s", result)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("tool_node result: %d messages, context length %d",
+                     len(result["messages"]), len(result["context"]))
     return result
 
 def extract_name_node(state: State):
@@ -94,7 +131,7 @@ def extract_name_node(state: State):
         logger.info("extract_name_node extracted name: %s", extracted_name)
         if extracted_name.lower() != current_name.lower():
             result = {**state, "user_name": extracted_name}
-            logger.debug("extract_name_node result: %s", result)
+            logger.debug("extract_name_node updated user_name to %s", extracted_name)
             return result
     logger.debug("extract_name_node no name extracted or name unchanged.")
     return state
@@ -111,13 +148,14 @@ async def rag_invoke_node(state: State):
     """
     logger.info("rag_invoke_node called with query: %s", state.get('query', ''))
     messages = state["messages"] + [HumanMessage(content=state["query"])]
-    logger.debug("rag_invoke_node messages: %s", messages)
+    logger.debug("rag_invoke_node messages: %d", len(messages))
     answer_text = await tl.llm_with_context(messages,
                                             context=state["context"],
                                             summary=state.get("summary", ""),
-                                            username=state.get("user_name", "")
+                                            username=state.get("user_name", ""),
+                                            on_token=get_stream_writer()
                                             )
-    logger.info("rag_invoke_node LLM answer: %s", answer_text)
+    logger.info("rag_invoke_node LLM answer length: %d", len(answer_text))
     messages.append(AIMessage(content=answer_text))
     result = {
         "response": answer_text,
@@ -127,7 +165,9 @@ async def rag_invoke_node(state: State):
         "summary": state.get("summary", ""),
         "user_name": state.get("user_name", ""),
     }
-    logger.debug("rag_invoke_node result: %s", result)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("rag_invoke_node result: %d messages, context length %d",
+                     len(result["messages"]), len(result["context"]))
     return result
 
 async def smalltalk_node(state: State):
@@ -144,12 +184,13 @@ async def smalltalk_node(state: State):
     messages = state["messages"] + [HumanMessage(content=state["query"])]
     summary = state.get("summary") or ""
     summary_message = (f"This is summary of the conversation to date: {summary}\n\nExtend the summary by taking into account the new messages above:" if summary else None)
-    logger.debug("smalltalk_node messages: %s, summary_message: %s", messages, summary_message)
+    logger.debug("smalltalk_node messages: %d, summary present: %s", len(messages), bool(summary_message))
     answer_text = await tl.smalltalk_tool(messages,
                                           summary=summary_message,
-                                          username=state.get("user_name", "")
+                                          username=state.get("user_name", ""),
+                                          on_token=get_stream_writer()
                                           )
-    logger.info("smalltalk_node answer: %s", answer_text)
+    logger.info("smalltalk_node answer length: %d", len(answer_text))
     messages.append(AIMessage(content=answer_text))
     result = {
         "response": answer_text,
@@ -158,50 +199,72 @@ async def smalltalk_node(state: State):
         "query": state["query"],
         "context": state.get("context", ""),
         "user_name": state.get("user_name", ""),
+        "last_intent": "smalltalk",
+        "last_intent_turn": state.get("turn", 0),
     }
-    logger.debug("smalltalk_node result: %s", result)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("smalltalk_node result: %d messages", len(result["messages"]))
     return result
 
-async def summarize_conversation(state: State):
+async def summarize_conversation(state: State, thread_id: str):
     """
     Summarizes the conversation based on the message history.
+    Runs as a background task after the turn has returned, then writes the summary
+    and the pruned history back to the thread's checkpoint for the next turn.
 
     Args:
-        state (State): The current state.
-
-    Returns:
-        dict: Updated state with summary and pruned messages.
+        state (State): The state snapshot at the end of the turn.
+        thread_id (str): Conversation thread identifier.
     """
-    logger.info("summarize_conversation called")
-    summary = state.get("summary", "")
-    if summary:
-        summary_message = (
-            f"This is summary of the conversation to date: {summary}\n\n"
-            "Extend the summary by taking into account the new messages above:"
-        )
-    else:
-        summary_message = "Create a summary of the conversation above:"
-    messages = state["messages"] + [HumanMessage(content=summary_message)]
-    logger.debug("summarize_conversation messages: %s", messages)
-    summary_text = await tl.create_summary(messages)
-    logger.info("summarize_conversation summary_text: %s", summary_text)
-
-    pruned_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-2]]
-    logger.debug("summarize_conversation pruned_messages: %s", pruned_messages)
-    result = {
-        "summary": summary_text,
-        "messages": pruned_messages,
-        "query": state.get("query", ""),
-        "context": state.get("context", ""),
-        "response": state.get("response", ""),
-        "user_name": state.get("user_name", "")
-    }
-    logger.debug("summarize_conversation result: %s", result)
-    return result
+    if thread_id in _summaries_running:
+        logger.info("summarize_conversation already running for thread %s, skipping", thread_id)
+        return
+    _summaries_running.add(thread_id)
+    try:
+        logger.info("summarize_conversation called for thread %s", thread_id)
+        summary = state.get("summary", "")
+        if summary:
+            summary_message = (
+                f"This is summary of the conversation to date: {summary}\n\n"
+                "Extend the summary by taking into account the new messages above:"
+            )
+        else:
+            summary_message = "Create a summary of the conversation above:"
+        messages = state["messages"] + [HumanMessage(content=summary_message)]
+        logger.debug("summarize_conversation messages: %d", len(messages))
+        summary_text = await tl.create_summary(messages)
+        logger.info("summarize_conversation summary length: %d", len(summary_text))
+
+        history = state["messages"]
+        prune_ids = ([m.id for m in history[:-KEEP_LAST]]
+                     if len(history) > KEEP_LAST + 2 else [])
+        logger.debug("summarize_conversation prune_ids: %s", prune_ids)
+
+        # The turn's checkpointer is closed by now, so open one to write the summary back.
+        # Imported here because langgraph_builder imports this module.
+        from services.langgraph_builder import create_graph
+        config = {"configurable": {"thread_id": thread_id}}
+        async with open_checkpointer() as checkpointer:
+            graph = create_graph().compile(checkpointer=checkpointer)
+            snapshot = await graph.aget_state(config)
+            # Another worker may have pruned some of these messages already
+            current_ids = {m.id for m in snapshot.values.get("messages", [])}
+            update = {"summary": summary_text}
+            removals = [RemoveMessage(id=m_id) for m_id in prune_ids if m_id in current_ids]
+            if removals:
+                update["messages"] = removals
+            await graph.aupdate_state(config, update, as_node="connector_node")
+        logger.info("summarize_conversation saved summary for thread %s, pruned %d messages",
+                    thread_id, len(removals))
+    except Exception as e:
+        logger.error("summarize_conversation failed for thread %s: %s", thread_id, e)
+    finally:
+        _summaries_running.discard(thread_id)
 
 def route_by_intent(state: State):
     """
     Determines the next node based on query intent (technical or smalltalk).
+    Short follow-ups within a couple of turns of a technical answer stay on the tool path.
 
     Args:
         state (State): The current state.
@@ -210,7 +273,13 @@ def route_by_intent(state: State):
         str: The next node name ("tool" or "smalltalk").
     """
     logger.info("route_by_intent called with query: %s", state.get('query', ''))
-    intent = "tool" if tl.is_technical(state["query"]) else "smalltalk"
+    query = state["query"]
+    if (state.get("last_intent") == "tool"
+            and len(query.split()) < FOLLOWUP_MAX_WORDS
+            and state.get("turn", 0) - state.get("last_intent_turn", 0) <= FOLLOWUP_MAX_TURNS):
+        logger.info("route_by_intent treating short query as technical follow-up")
+        return "tool"
+    intent = "tool" if tl.is_technical(query) else "smalltalk"
     logger.info("route_by_intent determined intent: %s", intent)
     return intent
 
@@ -219,13 +288,17 @@ def should_summarize(state: State):
     logger.info("should_summarize called")
     messages = state["messages"]
     logger.debug("should_summarize message count: %s", len(messages))
-    if len(messages) > 6:
+    if len(messages) > SUMMARY_THRESHOLD:
         logger.info("should_summarize: will summarize_conversation")
         return "summarize_conversation"
     logger.info("should_summarize: will END")
     return END
 
-async def connector_node(state: State): # pylint: disable=unused-argument
-    """Passthrough state"""
+async def connector_node(state: State, config: RunnableConfig):
+    """Passthrough state; schedules summarization off the response path"""
     logger.info("connector_node called")
+    if should_summarize(state) != END:
+        task = asyncio.create_task(summarize_conversation(state, _thread_id(config)))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
     return {}
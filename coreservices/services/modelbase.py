@@ -1,10 +1,50 @@
+import itertools
+import os
+import threading
 from langchain_ollama import OllamaLLM
+from logger.logger import setup_logger
+
+logger = setup_logger("modelbase", 'log/modelbase.log')
+
+class RoundRobinLLM:
+    """
+    Sends each call to the next of several OllamaLLM clients, one per Ollama server,
+    so concurrent requests decode on different servers instead of queueing on one.
+    """
+    def __init__(self, replicas):
+        self.replicas = replicas
+        self._cycle = itertools.cycle(replicas)
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            return next(self._cycle)
+
+    def invoke(self, *args, **kwargs):
+        return self._next().invoke(*args, **kwargs)
+
+    async def ainvoke(self, *args, **kwargs):
+        return await self._next().ainvoke(*args, **kwargs)
+
+    def stream(self, *args, **kwargs):
+        return self._next().stream(*args, **kwargs)
+
+    def astream(self, *args, **kwargs):
+        return self._next().astream(*args, **kwargs)
 
 class LLMModel:
     _instance = None
-    
+    # Ollama unloads idle models after 5 minutes by default; keep them resident between questions
+    KEEP_ALIVE = "10m"
+
     def __init__(self, model_name: str = 'mistral', temperature: float = 0.0, api_url: str = 'http://host.docker.internal:5003'):
-        self.llmmodel = OllamaLLM(model=model_name, temperature=temperature, num_ctx= 8192, base_url=api_url)
+        # OLLAMA_URLS lists several Ollama servers, comma-separated, to spread requests over
+        urls = [url.strip() for url in os.getenv("OLLAMA_URLS", api_url).split(",") if url.strip()]
+        self.replicas = [OllamaLLM(model=model_name, temperature=temperature, num_ctx= 8192, base_url=url,
+                                   keep_alive=self.KEEP_ALIVE)
+                         for url in urls]
+        self.llmmodel = self.replicas[0] if len(self.replicas) == 1 else RoundRobinLLM(self.replicas)
+        logger.info("LLMModel using %d Ollama server(s): %s", len(urls), ", ".join(urls))
 
     @classmethod
     def get_instance(cls):
@@ -12,5 +52,22 @@ class LLMModel:
             cls._instance = cls()
         return cls._instance
 
+    def warmup(self):
+        """
+        Load the model weights into every Ollama server in the background,
+        so the first real request does not pay the model load time.
+        Called once at API startup (see api.app), not on first use.
+        """
+        def _run(replica):
+            try:
+                # Same num_ctx as real requests, otherwise Ollama would reload the model for them
+                replica.invoke("warmup", options={"num_ctx": replica.num_ctx, "num_predict": 1})
+                logger.info("LLM warmup completed on %s", replica.base_url)
+            except Exception as e:
+                logger.warning("LLM warmup failed on %s: %s", replica.base_url, e)
+
+        for replica in self.replicas:
+            threading.Thread(target=_run, args=(replica,), name="llm-warmup", daemon=True).start()
+
     def get_model(self):
         return self.llmmodel
@@ -2,12 +2,14 @@
 Tools module for handling prompt construction, technical/smalltalk routing, retrieval, and summary generation
 using LLMs and RAG engine for the CAI_Webex API Gateway.
 """
+import re
+import orjson
 import requests
-from typing import List
+from typing import Callable, List, Optional
 import traceback
-from langchain.prompts import ChatPromptTemplate
 from langchain.schema import BaseMessage, HumanMessage
 from services.modelbase import LLMModel
+from services.coalesce import RequestCoalescer, normalize_query
 from prompt.prompt import TEMPLATE_TECHNICAL, TEMPLATE_GENERAL, TEMPLATE_SUMMARY
 from services.settings import rag_apiendpoint
 from logger.logger import setup_logger
@@ -15,6 +17,18 @@ from logger.logger import setup_logger
 
 logger = setup_logger("langgraphtools", 'log/langgraphtools.log')
 
+_inflight = RequestCoalescer()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+TECHNICAL_KEYWORDS: List[str] = [
+    "webex", "cucm", "cisco", "configure",
+    "error", "deployment", "call manager",
+    "troubleshoot", "installation"
+]
+# Single alternation scanned once in C, instead of one substring pass per keyword
+_TECHNICAL_RE = re.compile("|".join(map(re.escape, TECHNICAL_KEYWORDS)), re.IGNORECASE)
+
 class Tools:
     """Provides tools for prompt handling, technical/smalltalk routing, and summary creation."""
     def __init__(self):
@@ -29,24 +43,47 @@ class Tools:
         self.rgurl = rag_apiendpoint
         logger.info("Tools class initialized with LLMModel and RagEngine.")
 
-    def _returnprompt(self, template):
+    def _returnprompt(self, template: str, **variables) -> List[BaseMessage]:
         """
-        Returns a ChatPromptTemplate from the given template string.
+        Returns the prompt messages for the given template string.
+        Produces the same single HumanMessage as ChatPromptTemplate.from_template,
+        via str.format_map, without the template machinery on every call.
 
         Args:
             template (str): The prompt template string.
+            **variables: Values substituted into the template.
 
         Returns:
-            ChatPromptTemplate: The constructed prompt template.
+            List[BaseMessage]: The formatted prompt messages.
         """
         try:
             logger.debug("Returning prompt from template: %.30s...", template)
-            return ChatPromptTemplate.from_template(template)
-        except (ValueError, TypeError) as e:
+            return [HumanMessage(content=template.format_map(variables))]
+        except (ValueError, TypeError, KeyError) as e:
             logger.error("Error constructing prompt: %s", e)
             logger.debug("%s", traceback.format_exc())
             raise
 
+    async def _astream_text(self,
+                            formatted_prompt,
+                            on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Streams the model output, forwarding each token as it arrives.
+
+        Args:
+            formatted_prompt: Prompt messages for the model.
+            on_token (Callable[[str], None], optional): Called with every streamed chunk.
+
+        Returns:
+            str: The full accumulated response.
+        """
+        chunks = []
+        async for chunk in self.model.astream(formatted_prompt):
+            chunks.append(chunk)
+            if on_token is not None:
+                on_token(chunk)
+        return "".join(chunks)
+
     def is_technical(self, query: str) -> bool:
         """
         Determines if the query is technical based on keywords.
@@ -57,18 +94,14 @@ class Tools:
         Returns:
             bool: True if technical, False otherwise.
         """
-        technical_keywords: List[str] = [
-            "webex", "cucm", "cisco", "configure",
-            "error", "deployment", "call manager",
-            "troubleshoot", "installation"
-        ]
-        is_tech = any(word in query.lower() for word in technical_keywords)
+        is_tech = _TECHNICAL_RE.search(query) is not None
         logger.info("is_technical('%s') → %s", query, is_tech)
         return is_tech
 
     def retrieval_tool(self, query: str) -> str:
         """
         Retrieves context for a technical query using the retrieval engine.
+        Concurrent calls for the same query share a single request.
 
         Args:
             query (str): The user's query.
@@ -76,12 +109,18 @@ class Tools:
         Returns:
             str: Retrieved context or empty string on error.
         """
+        return _inflight.run(normalize_query(query), self._retrieve, query)
+
+    def _retrieve(self, query: str) -> str:
         try:
             logger.info("[retrieval_tool] Running for query: %r", query)
             #result = self.rg.generate_response(query)
             data = {"query":query}
-            response = requests.post(self.rag_apiendpoint, json=data, timeout=30)
-            result = response.json()
+            response = requests.post(self.rgurl,
+                                     data=orjson.dumps(data),
+                                     headers=_JSON_HEADERS,
+                                     timeout=30)
+            result = orjson.loads(response.content)
             parsed_result = result["context"]
             logger.info("[retrieval_tool] Retrieved context length: %d",
                         len(parsed_result) if parsed_result else 0)
@@ -95,15 +134,18 @@ class Tools:
                                messages: List[BaseMessage],
                                context: str,
                                summary: str = "",
-                               username: str = "") -> str:
+                               username: str = "",
+                               on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Generates a response using the LLM with provided context and messages.
+        Tokens are streamed to on_token as they are generated.
 
         Args:
             messages (List[BaseMessage]): Conversation messages.
             context (str): Technical context.
             summary (str, optional): Conversation summary.
             username (str, optional): Username.
+            on_token (Callable[[str], None], optional): Token callback.
 
         Returns:
             str: Model response or error message.
@@ -115,15 +157,15 @@ class Tools:
         try:
             logger.info("[llm_with_context] Messages length: %d, context length: %d",
                         len(messages), len(context) if context else 0)
-            prompt = self._returnprompt(self.prompt_technical)
-            formatted_prompt = (await prompt.aformat_prompt(
+            formatted_prompt = self._returnprompt(
+                self.prompt_technical,
                 technical_docs=context,
                 summary=summary,
                 messages=full_conversation_text,
                 user_name=username
-            )).to_messages()
+            )
             logger.debug("[llm_with_context] Prompt formatted; invoking model.")
-            response = await self.model.ainvoke(formatted_prompt)
+            response = await self._astream_text(formatted_prompt, on_token)
             logger.info("[llm_with_context] Received response of length %s",
                         len(response) if isinstance(response, str) else 'N/A')
             return response
@@ -135,14 +177,17 @@ class Tools:
     async def smalltalk_tool(self,
                              messages: List[BaseMessage],
                              summary=None,
-                             username:str ="") -> str:
+                             username:str ="",
+                             on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Handles smalltalk queries using the general prompt.
+        Tokens are streamed to on_token as they are generated.
 
         Args:
             messages (List[BaseMessage]): Conversation messages.
             summary (str, optional): Conversation summary.
             username (str, optional): Username.
+            on_token (Callable[[str], None], optional): Token callback.
 
         Returns:
             str: Model response or error message.
@@ -155,21 +200,14 @@ class Tools:
             has_summary = bool((summary or "").strip())
             logger.info("[smalltalk_tool] Messages length: %d, Summary present: %s",
                         len(messages), 'Yes' if has_summary else 'No')
-            prompt = self._returnprompt(self.prompt_general)
-            if summary:
-                formatted_prompt = (await prompt.aformat_prompt(
-                    messages=full_conversation_text,
-                    summary=summary,
-                    user_name=username
-                )).to_messages()
-            else:
-                formatted_prompt = (await prompt.aformat_prompt(
-                    messages=full_conversation_text,
-                    summary="no summary",
-                    user_name=username
-                )).to_messages()
+            formatted_prompt = self._returnprompt(
+                self.prompt_general,
+                messages=full_conversation_text,
+                summary=summary if summary else "no summary",
+                user_name=username
+            )
             logger.debug("[smalltalk_tool] Prompt formatted; invoking model.")
-            response = await self.model.ainvoke(formatted_prompt)
+            response = await self._astream_text(formatted_prompt, on_token)
             logger.info("[smalltalk_tool] Received response of length %s",
                         len(response) if isinstance(response, str) else 'N/A')
             return response
@@ -191,11 +229,10 @@ class Tools:
             str: Generated summary or error message.
         """
         try:
-            prompt = self._returnprompt(self.promt_summary)
-            formatted_prompt = (await prompt.aformat_prompt(messages = summary_messages
-                )).to_messages()
+            formatted_prompt = self._returnprompt(self.promt_summary,
+                                                  messages=summary_messages)
             logger.info("[create_summary] Called with %d messages", len(summary_messages))
-            result = await self.model.ainvoke(formatted_prompt)
+            result = await self._astream_text(formatted_prompt)
             logger.info("[create_summary] Summary generated with length %s",
                         len(result) if isinstance(result, str) else 'N/A')
             return result
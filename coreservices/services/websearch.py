@@ -1,15 +1,74 @@
 import os
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import List
+from urllib.parse import urlsplit
+import orjson
 import requests
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from tavily import TavilyClient
 from prompt.prompt import TEMPLATE_CLEANDATA
 from services.modelbase import LLMModel
+from services.coalesce import RequestCoalescer, normalize_query
 from services.settings import cleanraw, domains
 from logger.logger import setup_logger
 
 logger = setup_logger("websearch", 'log/websearchapi.log')
 
+_inflight = RequestCoalescer()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _canonical_url(url: str) -> str:
+    """Normalize a URL for duplicate detection: lowercase host, no fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{parts.netloc.lower()}{path}{query}"
+
+def _content_key(text: str) -> bytes:
+    """Digest of a page's lowercase text with whitespace collapsed; equal for copies of the same page."""
+    return hashlib.blake2b(" ".join(text.lower().split()).encode(), digest_size=16).digest()
+
+@dataclass(slots=True)
+class WebResults:
+    """
+    Web search results stored column-wise.
+
+    Filtering passes only flip entries in `keep`; downstream code reads the kept rows.
+    """
+    urls: List[str] = field(default_factory=list)
+    raw_content: List[str] = field(default_factory=list)
+    keep: List[bool] = field(default_factory=list)
+
+    def mark_duplicates(self):
+        """
+        Clear `keep` for repeated URLs, then for pages whose normalized text repeats.
+        Only pages that survive the URL pass are hashed.
+        """
+        seen_urls = set()
+        seen_content = set()
+        for i, url in enumerate(self.urls):
+            url_key = _canonical_url(url)
+            if url_key in seen_urls:
+                self.keep[i] = False
+                continue
+            seen_urls.add(url_key)
+            if self.raw_content[i]:
+                content_key = _content_key(self.raw_content[i])
+                if content_key in seen_content:
+                    self.keep[i] = False
+                    continue
+                seen_content.add(content_key)
+
+    def kept_urls(self) -> List[str]:
+        return [u for u, k in zip(self.urls, self.keep) if k]
+
+    def kept_raw_content(self) -> List[str]:
+        return [r for r, k in zip(self.raw_content, self.keep) if k]
+
 class WebSearch:
     def __init__(self):
         """
@@ -27,7 +86,7 @@ class WebSearch:
                 raise ValueError("TAVILY_API_KEY not found")
 
             self.tavily_client = TavilyClient(api_key=self.tavilyapikey)
-            self.prompt = TEMPLATE_CLEANDATA
+            self.prompt = ChatPromptTemplate.from_template(TEMPLATE_CLEANDATA)
             _model_wrapper = LLMModel.get_instance()
             self.model = _model_wrapper.get_model()
             logger.info("WebSearch initialized successfully")
@@ -53,13 +112,13 @@ class WebSearch:
             logger.info("tavilywrapper called with query: %s, top_k: %s", query, top_k)
             url = domains
             response = requests.get(url, timeout=30)
-            include_domains = response.json()
+            include_domains = orjson.loads(response.content)
             result = self.tavily_client.search(query,
                                         max_results=top_k,
                                         include_raw_content=True,
                                         include_domains=include_domains["domains"]
                                         )
-            logger.debug("tavilywrapper search results: %s", result)
+            logger.debug("tavilywrapper returned %d results", len(result.get("results", [])))
             return result
         except Exception as e:
             logger.error("tavilywrapper failed for query '%s': %s", query, str(e))
@@ -68,12 +127,13 @@ class WebSearch:
     def search_web(self, query):
         """
         Search the web and extract URLs and raw content from results.
+        Duplicate URLs and repeated pages are dropped so they are not cleaned twice.
         
         Args:
             query (str): The search query to execute.
             
         Returns:
-            dict: Dictionary containing 'urls' and 'raw_content' lists.
+            WebResults: Column-wise URLs and raw content, with duplicates marked.
             
         Raises:
             Exception: If web search fails or result processing fails.
@@ -81,15 +141,17 @@ class WebSearch:
         try:
             logger.info("search_web called with query: %s", query)
             search_results = self.tavilywrapper(query, 2)
-            search_content = {'urls':[],
-                        'raw_content': []
-                        }
+            search_content = WebResults()
             for result in search_results['results']:
-                search_content['urls'].append(result['url'])
-                search_content['raw_content'].append(result['raw_content'])
+                raw = result['raw_content']
+                search_content.urls.append(result['url'])
+                search_content.raw_content.append(raw)
+                search_content.keep.append(True)
+            search_content.mark_duplicates()
 
-            logger.info("search_web found %s results", len(search_content['urls']))
-            logger.debug("search_web URLs: %s", search_content['urls'])
+            logger.info("search_web found %s results (%s after dedup)",
+                        len(search_content.urls), sum(search_content.keep))
+            logger.debug("search_web URLs: %s", search_content.kept_urls())
             return search_content
         except Exception as e:
             logger.error("search_web failed for query '%s': %s", query, str(e))
@@ -111,7 +173,7 @@ class WebSearch:
         try:
             logger.info("build_context_web called with query: %s", query)
             web_content = self.search_web(query)
-            cleaned_content = self.str_clean_wrapper(web_content['raw_content'])
+            cleaned_content = self.str_clean_wrapper(web_content.kept_raw_content())
             joined_string = "\n".join(cleaned_content)
             logger.info("build_context_web created context of length: %s", len(joined_string))
             return joined_string
@@ -143,8 +205,11 @@ class WebSearch:
                     #cleaned_item = clean_for_web_agent(item)
                     data = {"rawstrings":item}
                     url = cleanraw
-                    response = requests.post(url, json=data, timeout=30)
-                    cleaned_item = response.json()
+                    response = requests.post(url,
+                                             data=orjson.dumps(data),
+                                             headers=_JSON_HEADERS,
+                                             timeout=30)
+                    cleaned_item = orjson.loads(response.content)
                     cleaned_items.append(cleaned_item["cleaned_str"])
                 except ValueError as e:
                     logger.warning("Failed to clean item %s: %s", i, str(e))
@@ -166,6 +231,8 @@ class WebSearch:
         1. Builds web context from search results
         2. Formats the context using a prompt template
         3. Invokes the LLM model to process the data
+
+        Concurrent calls for the same query share a single pipeline run.
         
         Args:
             query (str): The search query to execute.
@@ -176,16 +243,20 @@ class WebSearch:
         Raises:
             Exception: If any step in the pipeline fails.
         """
+        return _inflight.run(normalize_query(query), self._modelcall, query)
+
+    def _modelcall(self, query):
         try:
             logger.info("modelcall called with query: %s", query)
             context = self.build_context_web(query)
-            prompt = ChatPromptTemplate.from_template(self.prompt)
-            formatted_prompt = prompt.format_prompt(raw_data=context
+            formatted_prompt = self.prompt.format_prompt(raw_data=context
                                                     ).to_messages()
-            logger.debug("modelcall formatted prompt: %s", formatted_prompt)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("modelcall formatted prompt of length %d",
+                             sum(len(m.content) for m in formatted_prompt))
             model_response = self.model.invoke(formatted_prompt)
             logger.info("modelcall completed successfully")
-            logger.debug("modelcall response: %s", model_response)
+            logger.debug("modelcall response length: %d", len(model_response))
             return model_response
         except Exception as e:
             logger.error("modelcall failed for query '%s': %s", query, str(e))
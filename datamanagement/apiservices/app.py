@@ -1,3 +1,7 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 from prometheus_client import (
     Counter,
     Histogram,
@@ -5,18 +9,26 @@ from prometheus_client import (
     CONTENT_TYPE_LATEST
     )
 from fastapi import FastAPI
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response
 from core.logger import setup_logger
 from cleanrawstring.cleanraw import clean_for_web_agent
 from apiservices.parastruct import CleanRaw, Query
 from core.rag_engine import RagEngine
+from core.embedding_model import POOL_SIZE
 from config.settings import INCLUDE_DOMAINS
 
 logger = setup_logger("datasetvice", 'log/datasetvice.log')
 
-dataservice = FastAPI()
+dataservice = FastAPI(default_response_class=ORJSONResponse)
+# INCLUDE_DOMAINS is fixed at startup, so /domains serves pre-encoded bytes
+_DOMAINS_BODY = orjson.dumps({"domains": INCLUDE_DOMAINS})
 rg = RagEngine()
 
+# Blocking work runs on dedicated pools so the event loop stays free.
+# RAG requests are capped at the number of embedding model replicas.
+CLEAN_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cleanraw")
+RAG_EXECUTOR = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="ragengine")
+
 REQUEST_COUNT = Counter(
     "api_requests_total", "Total API Requests", ["endpoint", "method"]
 )
@@ -27,69 +39,103 @@ REQUEST_LATENCY = Histogram(
     "api_request_latency_seconds", "API Request latency in seconds", ["endpoint", "method"]
 )
 
+# Label children are bound once so the request path only calls inc()/time()
+RC_ROOT = REQUEST_COUNT.labels(endpoint="/", method="GET")
+RL_ROOT = REQUEST_LATENCY.labels(endpoint="/", method="GET")
+RC_CLEAN = REQUEST_COUNT.labels(endpoint="/cleanraw", method="POST")
+RL_CLEAN = REQUEST_LATENCY.labels(endpoint="/cleanraw", method="POST")
+RC_DOMAINS = REQUEST_COUNT.labels(endpoint="/domains", method="GET")
+RL_DOMAINS = REQUEST_LATENCY.labels(endpoint="/domains", method="GET")
+RC_RAG = REQUEST_COUNT.labels(endpoint="/ragengine", method="POST")
+RL_RAG = REQUEST_LATENCY.labels(endpoint="/ragengine", method="POST")
+ERR_CLEAN = {err: ERROR_COUNT.labels(endpoint="/cleanraw", error_type=err)
+             for err in ("ValueError", "RuntimeError")}
+ERR_RAG = {err: ERROR_COUNT.labels(endpoint="/ragengine", error_type=err)
+           for err in ("ValueError", "RuntimeError")}
+
+# Rendered /metrics output is reused for METRICS_TTL seconds
+METRICS_TTL = 1.0
+_metrics_cache = {"ts": 0.0, "body": b""}
+_metrics_lock = asyncio.Lock()
+
 @dataservice.get("/metrics")
-def metrics():
+async def metrics():
     """
     Expose Prometheus metrics.
+    The rendered output is cached briefly so scrape cost does not grow with label cardinality.
     """
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    if time.monotonic() - _metrics_cache["ts"] > METRICS_TTL:
+        async with _metrics_lock:
+            now = time.monotonic()
+            if now - _metrics_cache["ts"] > METRICS_TTL:
+                _metrics_cache["body"] = generate_latest()
+                _metrics_cache["ts"] = now
+    return Response(_metrics_cache["body"], media_type=CONTENT_TYPE_LATEST)
 
-@dataservice.get("/")
-def root():
+@dataservice.get("/", response_model=None)
+async def root():
     """
     Root endpoint for health check or basic info.
     """
-    REQUEST_COUNT.labels(endpoint="/", method="GET").inc()
-    with REQUEST_LATENCY.labels(endpoint="/", method="GET").time():
+    RC_ROOT.inc()
+    with RL_ROOT.time():
         logger.info("Root endpoint called.")
         return {"message": "This is API router for Chatbot"}
 
-@dataservice.post("/cleanraw")
-def cleanraw(request: CleanRaw):
-    REQUEST_COUNT.labels(endpoint="/cleanraw", method="POST").inc()
-    with REQUEST_LATENCY.labels(endpoint="/cleanraw", method="POST").time():
+@dataservice.post("/cleanraw", response_model=None)
+async def cleanraw(request: CleanRaw):
+    RC_CLEAN.inc()
+    with RL_CLEAN.time():
         str_retrieved = request.rawstrings
         try:
-            clean_str = clean_for_web_agent(str_retrieved)
+            loop = asyncio.get_running_loop()
+            clean_str = await loop.run_in_executor(CLEAN_EXECUTOR, clean_for_web_agent, str_retrieved)
             return {"cleaned_str":clean_str}
         except ValueError as e:
-            ERROR_COUNT.labels(endpoint="/cleanraw", error_type="ValueError").inc()
+            ERR_CLEAN["ValueError"].inc()
             logger.error("ValueError during /cleanraw handling: %s", e, exc_info=True)
             return {"error": "Invalid input provided."}
         except RuntimeError as e:
-            ERROR_COUNT.labels(endpoint="/cleanraw", error_type="RuntimeError").inc()
+            ERR_CLEAN["RuntimeError"].inc()
             logger.error("RuntimeError during /cleanraw handling: %s", e, exc_info=True)
             return {"error": "Internal processing error."}
 
 
-@dataservice.get("/domains")
-def getdomains():
-    REQUEST_COUNT.labels(endpoint="/domains", method="GET").inc()
-    with REQUEST_LATENCY.labels(endpoint="/domains", method="GET").time():
-        try:
-            return {"domains": INCLUDE_DOMAINS}
-        except ValueError as e:
-            ERROR_COUNT.labels(endpoint="/domains", error_type="ValueError").inc()
-            logger.error("ValueError during /domains handling: %s", e, exc_info=True)
-            return {"error": "Invalid input provided."}
-        except RuntimeError as e:
-            ERROR_COUNT.labels(endpoint="/domains", error_type="RuntimeError").inc()
-            logger.error("RuntimeError during /domains handling: %s", e, exc_info=True)
-            return {"error": "Internal processing error."}
+@dataservice.get("/domains", response_model=None)
+async def getdomains():
+    RC_DOMAINS.inc()
+    with RL_DOMAINS.time():
+        return Response(_DOMAINS_BODY, media_type="application/json")
 
-@dataservice.post("/ragengine")
-def Rag_Engine(request: Query):
-    REQUEST_COUNT.labels(endpoint="/ragengine", method="POST").inc()
-    with REQUEST_LATENCY.labels(endpoint="/ragengine", method="POST").time():
+@dataservice.post("/ragengine", response_model=None)
+async def Rag_Engine(request: Query):
+    RC_RAG.inc()
+    with RL_RAG.time():
         query_retrieved = request.query
         try:
-            context = rg.generate_response(query_retrieved)
+            if query_retrieved:
+                # Embedding starts while the request waits for a RAG worker; the worker then
+                # finds it cached or joins the in-flight call
+                rg.vec_search.prefetch_embedding(query_retrieved)
+            loop = asyncio.get_running_loop()
+            context = await loop.run_in_executor(RAG_EXECUTOR, rg.generate_response, query_retrieved)
             return {"context": context}
         except ValueError as e:
-            ERROR_COUNT.labels(endpoint="/ragengine", error_type="ValueError").inc()
+            ERR_RAG["ValueError"].inc()
             logger.error("ValueError during /ragengine handling: %s", e, exc_info=True)
             return {"error": "Invalid input provided."}
         except RuntimeError as e:
-            ERROR_COUNT.labels(endpoint="/ragengine", error_type="RuntimeError").inc()
+            ERR_RAG["RuntimeError"].inc()
             logger.error("RuntimeError during /ragengine handling: %s", e, exc_info=True)
             return {"error": "Internal processing error."}
+
+if __name__ == "__main__":
+    # Models and thread pools are per process, so scale with one worker per container.
+    # For process management in production:
+    #   gunicorn apiservices.app:dataservice -k uvicorn.workers.UvicornWorker -b 0.0.0.0:8001
+    import uvicorn
+    uvicorn.run("apiservices.app:dataservice",
+                host="0.0.0.0",
+                port=8001,
+                loop="uvloop",
+                http="httptools")
@@ -1,24 +1,37 @@
-import re
+try:
+    # RE2 matches in linear time, so the non-greedy .*? scrubs cannot backtrack badly
+    import re2 as _re
+except ImportError:
+    import re as _re
 
-def clean_for_web_agent(raw: str):
-    cleaned = re.sub(r'!\[.*?\]\(.*?\)', '', raw)
-    cleaned = re.sub(r'https?://[^\s)]+', '', cleaned)
+# Patterns are compiled once at import; related scrubs are fused into single alternations.
+# Case-insensitivity is written inline as (?i) so the same patterns work on re and re2.
+_RE_IMAGE = _re.compile(r'!\[.*?\]\(.*?\)')
+_RE_URL = _re.compile(r'https?://[^\s)]+')
+_RE_JUNK_LINKS = _re.compile(
+    r'(?i)\[.*?\]\((?:javascript:void\(0\)|/t5/community-help-knowledge-base/community-help/ta-p/4662356|/html/assets/.*?\.pdf)\)'
+)
+_RE_HASHES = _re.compile(r'[#]{2,}')
+# Also consumes the blank lines after the warning, as the old blank-line collapse pass did
+_RE_USER_AGENT = _re.compile(r'USER_AGENT environment variable not set,.*\n(?:\s*\n)?')
+_RE_BADGES = _re.compile(r'!\[.*?\]\(.*?\)|\[[A-Za-z \d]+\]\(.*?avatar.*?\)|\[Level \d+\]')
+_RE_LEVEL_TAIL = _re.compile(r'(Level \d+).*')
+_RE_FOOTER = _re.compile(r'(?i)Discover and save your favorite ideas[\s\S]*$')
 
-    cleaned = re.sub(r'\[.*?\]\((javascript:void\(0\)|/t5/community-help-knowledge-base/community-help/ta-p/4662356|/html/assets/.*?\.pdf)\)', '', cleaned, flags=re.IGNORECASE)
+def clean_for_web_agent(raw: str):
+    cleaned = _RE_IMAGE.sub('', raw)
+    cleaned = _RE_URL.sub('', cleaned)
+    cleaned = _RE_JUNK_LINKS.sub('', cleaned)
 
-    cleaned = re.sub(r'[#]{2,}', '', cleaned)
-    cleaned = re.sub(r'\n\s*\n', '\n', cleaned)
+    cleaned = _RE_HASHES.sub('', cleaned)
     cleaned = cleaned.strip()
 
-    cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
-
-    cleaned = re.sub(r'USER_AGENT environment variable not set,.*\n', '', cleaned)
+    cleaned = _RE_USER_AGENT.sub('', cleaned)
 
-    cleaned = re.sub(r'!\[.*?\]\(.*?\)', '', cleaned)
-    cleaned = re.sub(r'\[[A-Za-z \d]+\]\(.*?avatar.*?\)', '', cleaned)
-    cleaned = re.sub(r'\[Level \d+\]', '', cleaned)
-    cleaned = re.sub(r'(Level \d+).*', '', cleaned)
-    cleaned = '\n'.join(line.strip() for line in cleaned.splitlines() if line.strip())
-    cleaned = re.sub(r'Discover and save your favorite ideas[\s\S]*$', '', cleaned, flags=re.IGNORECASE)
+    cleaned = _RE_BADGES.sub('', cleaned)
+    cleaned = _RE_LEVEL_TAIL.sub('', cleaned)
+    # Single pass strips every line and drops blank ones, which also collapses runs of empty lines
+    cleaned = '\n'.join(line for line in map(str.strip, cleaned.splitlines()) if line)
+    cleaned = _RE_FOOTER.sub('', cleaned)
 
     return cleaned
@@ -0,0 +1,81 @@
+"""
+Module: batching.py
+
+Request-coalescing micro-batcher. Work items submitted from many threads are collected
+for a few milliseconds and handed to the model in one call, so concurrent queries share
+a single embedding or cross-encoder forward pass instead of paying for one each.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+from core.logger import setup_logger
+
+logger = setup_logger('batching', 'log/batching.log')
+
+class MicroBatcher:
+    """
+    Background thread that batches submitted items and resolves one Future per item.
+
+    Attributes:
+        fn (Callable): Called with a list of items; returns one result per item, in order.
+        max_batch_size (int): Max items per call to `fn`.
+        max_wait_ms (float): How long the first item of a batch waits for company.
+    """
+    def __init__(self, fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 8.0,
+                 name: str = "micro-batcher"):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        logger.info("MicroBatcher %s started (max_batch_size=%d, max_wait_ms=%.1f)",
+                    name, max_batch_size, max_wait_ms)
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item (Any): Single input for `fn`.
+
+        Returns:
+            Future: Resolves to the result for this item.
+        """
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.fn(items)
+                # A short result list would leave the trailing callers waiting forever
+                if len(results) != len(items):
+                    raise ValueError(f"fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                logger.error("Batch of %d items failed: %s", len(items), e)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            logger.debug("Processed batch of %d items", len(items))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
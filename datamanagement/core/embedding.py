@@ -3,7 +3,6 @@ import os
 from core.logger import setup_logger
 from core.factory import ScraperFactory
 from core.generatebase import ChunkandGenerate
-from core.embedding_model import EmbeddingModel
 
 logger = setup_logger('chunk_and_embed', 'log/chunk_and_embed.log')
 
@@ -11,19 +10,21 @@ class ChunkAndEmbed(ChunkandGenerate):
     """
     Wrapper to chunk text and generate sentence-transformer embeddings.
     """
-    def __init__(self, source, url, verbose: bool = False):
+    def __init__(self, source, url, verbose: bool = False, embedding_lookup=None):
         super().__init__()
         self.source = source
         self.url = url
         self.verbose = verbose
+        self.embedding_lookup = embedding_lookup
         self.scraper = ScraperFactory.get_scraper(source, url)
-        model_wrapper = EmbeddingModel.get_instance()
-        self.model = model_wrapper.model
-        self.model_lock = model_wrapper.lock
-        logger.info(f"ChunkAndEmbed initialized with source={source}, url={url}")
+        logger.info("ChunkAndEmbed initialized with source=%s, url=%s", source, url)
 
     def generate_embedding(self, query = None, response_text = None):
-        query_text, response_text = self.scraper.scrape()
+        # Texts already scraped in bulk (see scraping.bulk) are used as given
+        if query is None and response_text is None:
+            query_text, response_text = self.scraper.scrape()
+        else:
+            query_text = query
 
         if not query_text or not response_text:
             logger.error("Scraping returned empty content.")
@@ -35,11 +36,15 @@ class ChunkAndEmbed(ChunkandGenerate):
         response_chunks = self.chunk_text(response_text)
 
         if self.verbose:
-            logger.info(f"Generated {len(query_chunks)} query chunks, {len(response_chunks)} response chunks.")
+            logger.info("Generated %d query chunks, %d response chunks.",
+                        len(query_chunks),
+                        len(response_chunks)
+                        )
 
-        with self.model_lock:
-            query_embeddings = [ self.model.encode(chunk).tolist() for chunk in query_chunks ]
-            response_embeddings = [ self.model.encode(chunk).tolist() for chunk in response_chunks ]
+        embeddings = self.encode_chunks(query_chunks + response_chunks,
+                                        lookup=self.embedding_lookup).tolist()
+        query_embeddings = embeddings[:len(query_chunks)]
+        response_embeddings = embeddings[len(query_chunks):]
 
         logger.debug("Embeddings generated successfully.")
         return query_embeddings, response_embeddings, query_chunks, response_chunks
@@ -0,0 +1,95 @@
+"""
+Module: embedding_cache.py
+
+Two-level cache for chunk embeddings: an in-memory LRU in front of an on-disk store.
+Entries are keyed by model id and a content hash of the chunk, so repeated boilerplate
+(headers, footers, disclaimers) is only ever encoded once per model.
+"""
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+import diskcache
+import numpy as np
+from core.logger import setup_logger
+
+logger = setup_logger('embedding_cache', 'log/embedding_cache.log')
+
+class EmbeddingCache:
+    """
+    Chunk-embedding cache backed by diskcache with an LRU memory front.
+
+    Attributes:
+        model_id (str): Identifier of the embedding model, part of every key.
+        memory_size (int): Max number of vectors kept in memory.
+    """
+    def __init__(self, model_id: str, directory: str = "./emb_cache", memory_size: int = 4096):
+        self.model_id = model_id
+        self.memory_size = memory_size
+        self._disk = diskcache.Cache(directory)
+        self._memory = OrderedDict()
+        self._lock = Lock()
+        logger.info("EmbeddingCache initialized for model %s at %s", model_id, directory)
+
+    def key(self, chunk: str) -> str:
+        digest = hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self.model_id}:{digest}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+        raw = self._disk.get(key)
+        if raw is None:
+            return None
+        vector = np.frombuffer(raw, dtype=np.float32)
+        self._remember(key, vector)
+        return vector
+
+    def set(self, key: str, vector: np.ndarray, expire: Optional[float] = None):
+        vector = np.asarray(vector, dtype=np.float32)
+        self._disk.set(key, vector.tobytes(), expire=expire)
+        self._remember(key, vector)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def encode(self, chunks: List[str], encode_fn: Callable[[List[str]], np.ndarray],
+               lookup: Optional[Callable[[List[str]], Dict[str, np.ndarray]]] = None) -> np.ndarray:
+        """
+        Return embeddings for chunks, encoding only those not already cached.
+
+        Args:
+            chunks (List[str]): Text chunks to embed.
+            encode_fn (Callable): Batch encoder called with the cache misses.
+            lookup (Callable, optional): Called with the keys of cache misses before encoding;
+                returns previously stored embeddings by key (e.g. from MongoDB).
+
+        Returns:
+            np.ndarray: 2D array with one embedding row per chunk, in input order.
+        """
+        keys = [self.key(chunk) for chunk in chunks]
+        # Identical chunks share a key, so each distinct chunk is looked up and encoded once
+        unique = {k: chunk for k, chunk in zip(keys, chunks)}
+        found = {k: self.get(k) for k in unique}
+        misses = [k for k, vec in found.items() if vec is None]
+        if misses and lookup is not None:
+            for k, vector in lookup(misses).items():
+                self.set(k, vector)
+                found[k] = np.asarray(vector, dtype=np.float32)
+            misses = [k for k in misses if found[k] is None]
+        if misses:
+            fresh = encode_fn([unique[k] for k in misses])
+            for k, vector in zip(misses, fresh):
+                self.set(k, vector)
+                found[k] = np.asarray(vector, dtype=np.float32)
+        logger.debug("Embedding cache: %d chunks, %d distinct, %d misses", len(chunks), len(unique), len(misses))
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack([found[k] for k in keys])
@@ -1,20 +1,167 @@
+import os
+import queue
+from contextlib import contextmanager
 from threading import Lock
+import numpy as np
 from sentence_transformers import SentenceTransformer, CrossEncoder
 from core.utils import huggingface_login
+from core.embedding_cache import EmbeddingCache
 from core.logger import setup_logger
 
+try:
+    from onnxruntime import GraphOptimizationLevel, SessionOptions
+    from optimum.onnxruntime import (ORTModelForFeatureExtraction,
+                                     ORTModelForSequenceClassification,
+                                     ORTQuantizer)
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+except ImportError:
+    ORTModelForFeatureExtraction = None
+
 logger = setup_logger('embedding_model', 'log/embedding_model.log')
 
+EMBEDDING_MODEL_ID = "sentence-transformers/all-mpnet-base-v2"
+INT8_MODEL_DIR = "./hf_cache/mpnet-int8"
+CROSS_ENCODER_MODEL_ID = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+CROSS_ENCODER_INT8_DIR = "./hf_cache/ms-marco-int8"
+# On-disk embedding cache location; mount it as a volume to keep vectors across restarts
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./emb_cache")
+# Number of embedding model replicas (EMBEDDING_POOL_SIZE). Each replica is a full model copy,
+# so the default stays small; the FP32 torch fallback shares torch's process-wide threads and uses one.
+POOL_SIZE = max(1, int(os.getenv("EMBEDDING_POOL_SIZE",
+                                 "2" if ORTModelForFeatureExtraction is not None else "1")))
+# ONNX Runtime intra-op threads per replica, splitting the cores between replicas
+REPLICA_THREADS = max(1, (os.cpu_count() or 1) // POOL_SIZE)
+
+class QuantizedEncoder:
+    """
+    Int8 ONNX Runtime version of the sentence embedding model.
+
+    Exports and dynamically quantizes the model once into `save_dir`, then runs the
+    ORT session and applies the same mean pooling and L2 normalization as the
+    SentenceTransformer pipeline. Exposes the subset of `SentenceTransformer.encode`
+    used in this project.
+    """
+    max_seq_length = 384
+
+    def __init__(self, model_id: str, save_dir: str = INT8_MODEL_DIR, intra_op_threads: int = REPLICA_THREADS):
+        if not os.path.isdir(save_dir):
+            logger.info("Exporting %s to int8 ONNX at %s", model_id, save_dir)
+            fp32_model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(save_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        session_options = SessionOptions()
+        session_options.intra_op_num_threads = intra_op_threads
+        self.session = ORTModelForFeatureExtraction.from_pretrained(save_dir,
+                                                                    file_name="model_quantized.onnx",
+                                                                    session_options=session_options)
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True, show_progress_bar: bool = False):
+        """
+        Encode texts into normalized sentence embeddings.
+
+        Args:
+            texts (list[str]): Texts to embed.
+            batch_size (int): Number of texts per ORT run.
+
+        Returns:
+            numpy.ndarray: 2D array with one embedding row per text.
+        """
+        # Batch texts of similar length together to minimize padding, then restore input order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_texts = [texts[i] for i in order]
+        batches = []
+        for start in range(0, len(sorted_texts), batch_size):
+            tokens = self.tokenizer(sorted_texts[start:start + batch_size],
+                                    padding=True,
+                                    truncation=True,
+                                    max_length=self.max_seq_length,
+                                    return_tensors="np")
+            hidden = self.session(**tokens).last_hidden_state
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.vstack(batches)
+        return embeddings
+
+class QuantizedCrossEncoder:
+    """
+    Int8 ONNX Runtime version of the reranking cross-encoder.
+
+    Exported and quantized once into `save_dir` like `QuantizedEncoder`; the session
+    runs with full graph optimization on all cores. `predict` mirrors
+    `CrossEncoder.predict` for single-logit models, returning sigmoid scores.
+    """
+    max_length = 256
+
+    def __init__(self, model_id: str, save_dir: str = CROSS_ENCODER_INT8_DIR):
+        if not os.path.isdir(save_dir):
+            logger.info("Exporting %s to int8 ONNX at %s", model_id, save_dir)
+            fp32_model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(save_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        session_options = SessionOptions()
+        session_options.graph_optimization_level = GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = os.cpu_count() or 1
+        self.session = ORTModelForSequenceClassification.from_pretrained(save_dir,
+                                                                         file_name="model_quantized.onnx",
+                                                                         session_options=session_options,
+                                                                         provider="CPUExecutionProvider")
+
+    def predict(self, pairs, batch_size: int = 32, show_progress_bar: bool = False):
+        """
+        Score (query, passage) pairs.
+
+        Args:
+            pairs (list[tuple[str, str]]): Pairs to score.
+            batch_size (int): Number of pairs per ORT run.
+
+        Returns:
+            numpy.ndarray: 1D array of relevance scores in [0, 1].
+        """
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            tokens = self.tokenizer([q for q, _ in batch], [p for _, p in batch],
+                                    padding=True,
+                                    truncation=True,
+                                    max_length=self.max_length,
+                                    return_tensors="np")
+            logits = self.session(**tokens).logits[:, 0]
+            scores.append(1.0 / (1.0 + np.exp(-logits)))
+        if not scores:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(scores).astype(np.float32)
+
 class EmbeddingModel:
     _instance = None
     _lock = Lock()
 
     def __init__(self):
         huggingface_login()
-        logger.info("Initializing embedding and cross-encoder models")
-        self.model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2", cache_folder="./hf_cache")
+        logger.info("Initializing %d embedding model replicas", POOL_SIZE)
+        self._pool = queue.Queue()
+        for _ in range(POOL_SIZE):
+            self._pool.put(self._load_replica())
+        if ORTModelForFeatureExtraction is not None:
+            model_id = f"{EMBEDDING_MODEL_ID}-int8"
+        else:
+            logger.warning("optimum[onnxruntime] not installed, using FP32 SentenceTransformer")
+            model_id = EMBEDDING_MODEL_ID
         self.lock = Lock()
-        self.cross_en = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+        self.embedding_cache = EmbeddingCache(model_id, directory=EMBEDDING_CACHE_DIR)
+        self._cross_en = None
+        self._cross_en_lock = Lock()
 
     @classmethod
     def get_instance(cls):
@@ -24,8 +171,39 @@ class EmbeddingModel:
                     cls._instance = cls()
         return cls._instance
 
-    def get_model(self):
-        return self.model
-    
+    @staticmethod
+    def _load_replica():
+        if ORTModelForFeatureExtraction is not None:
+            return QuantizedEncoder(EMBEDDING_MODEL_ID)
+        return SentenceTransformer(EMBEDDING_MODEL_ID, cache_folder="./hf_cache")
+
+    @contextmanager
+    def acquire(self):
+        """
+        Check out an embedding model replica for the duration of the block.
+        Blocks until a replica is free.
+
+        Yields:
+            Embedding model exposing `encode(texts, batch_size=...)`.
+        """
+        model = self._pool.get()
+        try:
+            yield model
+        finally:
+            self._pool.put(model)
+
+    @property
+    def cross_en(self):
+        """Cross-encoder for reranking, loaded on first use."""
+        if self._cross_en is None:
+            with self._cross_en_lock:
+                if self._cross_en is None:
+                    logger.info("Loading cross-encoder model")
+                    if ORTModelForFeatureExtraction is not None:
+                        self._cross_en = QuantizedCrossEncoder(CROSS_ENCODER_MODEL_ID)
+                    else:
+                        self._cross_en = CrossEncoder(CROSS_ENCODER_MODEL_ID, max_length=256)
+        return self._cross_en
+
     def get_cross_encoder(self):
         return self.cross_en
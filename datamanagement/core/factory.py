@@ -14,13 +14,18 @@ class ScraperFactory:
         "community": CommunityScraper,
         "webex": WebexScraper,
     }
+    # Upper-case aliases let common spellings hit the dict without a .lower() per call
+    _registry.update({name.upper(): cls for name, cls in list(_registry.items())})
 
     @staticmethod
     def get_scraper(source: str, url: str) -> BaseScraper:
-        logger.info(f"Request to get scraper for source='{source}', url='{url}'")
-        scraper_cls = ScraperFactory._registry.get(source.lower())
-        if not scraper_cls:
-            logger.error(f"Unsupported source type requested: {source}")
-            raise ValueError(f"Unsupported source type: {source}")
-        logger.info(f"Instantiating scraper class: {scraper_cls.__name__}")
+        logger.info("Request to get scraper for source='%s', url='%s'", source, url)
+        try:
+            scraper_cls = ScraperFactory._registry[source]
+        except KeyError:
+            scraper_cls = ScraperFactory._registry.get(source.lower())
+            if not scraper_cls:
+                logger.error("Unsupported source type requested: %s", source)
+                raise ValueError(f"Unsupported source type: {source}") from None
+        logger.info("Instantiating scraper class: %s", scraper_cls.__name__)
         return scraper_cls(source, url)
@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from core.embedding_model import EmbeddingModel
 from core.logger import setup_logger
 
 logger = setup_logger('chunk_and_generate', 'log/chunk_and_generate.log')
 
 class ChunkandGenerate(ABC):
+    # Chunks are encoded in batches of this size in a single model.encode call
+    encode_batch_size = 32
+
     def __init__(self):
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=500,
@@ -20,6 +24,28 @@ class ChunkandGenerate(ABC):
         logger.debug("Chunking text of length %d", len(text))
         return self.splitter.split_text(text)
 
+    def encode_chunks(self, chunks, lookup=None):
+        """
+        Encode a list of chunks in batches.
+        Chunks already in the embedding cache, or returned by `lookup`, are not re-encoded.
+
+        Args:
+            chunks (list[str]): Text chunks to embed.
+            lookup (Callable, optional): Fallback store queried with cache-miss keys.
+
+        Returns:
+            numpy.ndarray: 2D array with one embedding row per chunk.
+        """
+        cache = EmbeddingModel.get_instance().embedding_cache
+        return cache.encode(chunks, self._encode_batch, lookup)
+
+    def _encode_batch(self, chunks):
+        with EmbeddingModel.get_instance().acquire() as model:
+            return model.encode(chunks,
+                                batch_size=self.encode_batch_size,
+                                convert_to_numpy=True,
+                                show_progress_bar=False)
+
     @abstractmethod
     def generate_embedding(self, query: str = None, response_text: str = None):
         logger.warning("Abstract method 'generate_embedding' not implemented")
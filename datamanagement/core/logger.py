@@ -1,19 +1,51 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+
+# File handler behind each logger's queue, by logger name
+_FILE_HANDLERS = {}
+# Set in pool workers, where loggers write their files directly
+_DIRECT = False
 
 def setup_logger(name: str, log_file: str, level=logging.INFO) -> logging.Logger:
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-    handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-    handler.setFormatter(formatter)
-
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
     # Prevent adding multiple handlers if logger already exists
     if not logger.hasHandlers():
-        logger.addHandler(handler)
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+        handler.setFormatter(formatter)
+        _FILE_HANDLERS[name] = handler
+        if _DIRECT:
+            logger.addHandler(handler)
+            return logger
+
+        # File I/O happens on the listener thread, off the request path
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
+
+def init_worker_logging():
+    """
+    ProcessPoolExecutor initializer. A forked worker inherits each logger's QueueHandler
+    but not the listener thread draining it, so its records would never be written;
+    attach the file handlers directly instead, also for loggers set up later in the worker.
+    """
+    global _DIRECT
+    _DIRECT = True
+    for name, handler in _FILE_HANDLERS.items():
+        logger = logging.getLogger(name)
+        for queued in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+            logger.removeHandler(queued)
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
@@ -1,5 +1,4 @@
 from core.generatebase import ChunkandGenerate
-from core.embedding_model import EmbeddingModel
 from core.logger import setup_logger
 
 logger = setup_logger('pdfembeddings', 'log/pdfembeddings.log')
@@ -8,14 +7,12 @@ class PDFEmbed(ChunkandGenerate):
     """
     Wrapper to chunk text and generate sentence-transformer embeddings.
     """
-    def __init__(self, source, url, verbose: bool = False):
+    def __init__(self, source, url, verbose: bool = False, embedding_lookup=None):
         super().__init__()
         self.source = source
         self.url = url
         self.verbose = verbose
-        model_wrapper = EmbeddingModel.get_instance()
-        self.model = model_wrapper.model
-        self.model_lock = model_wrapper.lock
+        self.embedding_lookup = embedding_lookup
         logger.info("ChunkAndEmbed initialized with source=%s, url=%s", source, url)
 
     def generate_embedding(self, query = None, response_text = None):
@@ -33,9 +30,10 @@ class PDFEmbed(ChunkandGenerate):
                         len(response_chunks)
                         )
 
-        with self.model_lock:
-            query_embeddings = [ self.model.encode(chunk).tolist() for chunk in query_chunks ]
-            response_embeddings = [ self.model.encode(chunk).tolist() for chunk in response_chunks ]
+        embeddings = self.encode_chunks(query_chunks + response_chunks,
+                                        lookup=self.embedding_lookup).tolist()
+        query_embeddings = embeddings[:len(query_chunks)]
+        response_embeddings = embeddings[len(query_chunks):]
 
         logger.debug("Embeddings generated successfully.")
         return query_embeddings, response_embeddings, query_chunks, response_chunks
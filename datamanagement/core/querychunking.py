@@ -7,25 +7,22 @@ logger = setup_logger('chunk_embed_rank', 'log/chunk_embed_rank.log')
 
 class ChunkEmbedRank(ChunkandGenerate):
     """
-    Inherits text chunking and provides embedding generation methods,
-    using a SentenceTransformer model and a cross-encoder for reranking.
+    Inherits text chunking and provides query embedding generation
+    using the shared embedding model.
 
     It handles:
     - Chunking the query if it exceeds a length threshold.
-    - Generating embeddings for each chunk with thread-safe locking.
+    - Generating embeddings for each chunk on a pooled model replica.
     - Returning a single embedding via averaging when multiple chunks exist.
     """
     def __init__(self):
         """
-        Initialize ChunkEmbedRank by loading models from the singleton EmbeddingModel instance.
-        Sets up model and cross-encoder references along with a threading lock.
+        Initialize ChunkEmbedRank and make sure the singleton EmbeddingModel is loaded.
+        Embedding models are checked out of the replica pool per encode.
         """
         super().__init__()
         logger.info("Initializing ChunkEmbedRank")
-        model_wrapper = EmbeddingModel.get_instance()
-        self.model = model_wrapper.get_model()
-        self.cross_encoder = model_wrapper.get_cross_encoder()
-        self.model_lock = model_wrapper.lock
+        EmbeddingModel.get_instance()
 
     def generate_embedding(self, query: str = None, response_text = None):
         """
@@ -36,27 +33,41 @@ class ChunkEmbedRank(ChunkandGenerate):
             query (str, optional): The input text query to embed.
 
         Returns:
-            list[float]: The embedding vector, either for single chunk or averaged for multiple chunks.
+            numpy.ndarray: The embedding vector, either for single chunk or averaged for multiple chunks.
         """
         if not query:
             logger.warning("generate_embedding() called with empty or None query.")
             return None
-        if len(query) >= 500:
-            query_chunks = self.chunk_text(query)
-            logger.info("Query length %d chars; split into %d chunks.",
-                        len(query),
-                        len(query_chunks)
-                        )
-        else:
-            query_chunks = [query]
+        if len(query) < 500:
             logger.info("Query length %d chars; embedding directly without chunking.", len(query))
+            return self.encode_chunks([query])[0]
 
-        with self.model_lock:
-            query_embedding = [self.model.encode(chunk).tolist() for chunk in query_chunks]
-            logger.debug("Generated embeddings for %d chunk(s).", len(query_embedding))
+        query_chunks = self.chunk_text(query)
+        logger.info("Query length %d chars; split into %d chunks.",
+                    len(query),
+                    len(query_chunks)
+                    )
+        query_embedding = self.encode_chunks(query_chunks)
+        logger.info("Averaged embedding across %d chunks.", len(query_embedding))
+        return query_embedding.mean(axis=0, dtype=np.float32)
 
-        if len(query_embedding) == 1:
-            return query_embedding[0]
-        else:
-            logger.info("Averaged embedding across %d chunks.", len(query_embedding))
-            return np.mean(query_embedding, axis=0).tolist()
+    def generate_embeddings(self, queries):
+        """
+        Embed several queries with a single encode call.
+        Long queries are chunked and averaged exactly as in `generate_embedding`.
+
+        Args:
+            queries (list[str]): Non-empty query strings.
+
+        Returns:
+            list[numpy.ndarray]: One embedding vector per query, in input order.
+        """
+        chunks, spans = [], []
+        for query in queries:
+            parts = [query] if len(query) < 500 else self.chunk_text(query)
+            spans.append((len(chunks), len(chunks) + len(parts)))
+            chunks.extend(parts)
+        vectors = self.encode_chunks(chunks)
+        logger.info("Embedded %d queries as %d chunks in one batch.", len(queries), len(chunks))
+        return [vectors[start] if end - start == 1 else vectors[start:end].mean(axis=0, dtype=np.float32)
+                for start, end in spans]
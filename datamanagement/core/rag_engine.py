@@ -22,7 +22,7 @@ print(response)
 
 Assumptions:
 - MongoDB collection contains documents with embedded vectors and full-text indexes.
-- Documents include fields such as 'thread_url', 'query_chunk', 'response_chunk'.
+- Documents hold one chunk each, with fields such as 'thread_url', 'kind', 'response_chunk'.
 - An LLM model (e.g., Mistral) is available via Ollama bindings.
 - Environment variable `MONGO_URI` is set for MongoDB connection.
 
@@ -35,6 +35,7 @@ import re
 import pymongo.errors
 from dotenv import load_dotenv
 from core.logger import setup_logger
+from core.semantic_cache import SemanticCache
 from db.vector_query import VectorSearch
 
 
@@ -77,6 +78,7 @@ class RagEngine:
             collection=self.collection,
             verbose=False
         )
+        self.semantic_cache = SemanticCache()
 
         logger.info(
             "Initialized RagEngine for Vector Search"
@@ -213,7 +215,7 @@ class RagEngine:
         try:
             all_thread_chunks = {
                 url: [doc['response_chunk'] for doc in self.vec_search.collection.find(
-                    {"thread_url": url},
+                    {"thread_url": url, "response_chunk": {"$exists": True}},
                     {"_id": 0, "response_chunk": 1}
                 ).limit(5)]
                 for url in thread_urls
@@ -239,6 +241,7 @@ class RagEngine:
     def generate_response(self, query: str) -> str:
         """
         Generate a response to the user query using hybrid retrieval and LLM.
+        Near-duplicate queries are answered from the semantic cache.
 
         Args:
             query (str): The user query.
@@ -249,6 +252,12 @@ class RagEngine:
         if not query:
             return "Query cannot be empty."
         try:
+            query_embedding = self.vec_search.get_embedded_query(query)
+            cached = self.semantic_cache.get(query_embedding)
+            if cached is not None:
+                logger.info("Semantic cache hit for query: %s", query[:60])
+                return cached
+
             search_results = self.perform_hybrid_search(query)
             if not search_results:
                 logger.info("No relevant documents found.")
@@ -263,6 +272,8 @@ class RagEngine:
                 context = self.build_context(top_chunks)
             logger.info("Here is length context for internal logging: %s", len(context))
             #response = self.chain.invoke({"technical_docs": context, "question": query})
+            if context:
+                self.semantic_cache.put(query_embedding, context)
             return context
 
         except pymongo.errors.ServerSelectionTimeoutError as e:
@@ -0,0 +1,83 @@
+"""
+Module: semantic_cache.py
+
+In-process semantic cache for RAG contexts. Queries are matched by cosine similarity
+of their embeddings, so near-duplicate questions reuse an earlier retrieval result.
+"""
+from threading import Lock
+from typing import Optional
+import numpy as np
+from core.logger import setup_logger
+
+logger = setup_logger('semantic_cache', 'log/semantic_cache.log')
+
+class SemanticCache:
+    """
+    Fixed-capacity cache of (query embedding, context) pairs with LRU eviction.
+
+    Embeddings are L2-normalized and kept in one preallocated float32 matrix,
+    so a lookup is a single matrix-vector product.
+
+    Attributes:
+        threshold (float): Minimum cosine similarity for a hit.
+        capacity (int): Max number of cached queries.
+    """
+    def __init__(self, threshold: float = 0.97, capacity: int = 4096):
+        self.threshold = threshold
+        self.capacity = capacity
+        self._vectors = None
+        self._contexts = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def get(self, embedding) -> Optional[str]:
+        """
+        Return the cached context of the most similar query, if similar enough.
+
+        Args:
+            embedding (numpy.ndarray): Query embedding.
+
+        Returns:
+            Optional[str]: Cached context, or None on a miss.
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            if not self._size:
+                return None
+            sims = self._vectors[:self._size] @ vector
+            idx = int(np.argmax(sims))
+            if sims[idx] < self.threshold:
+                return None
+            self._clock += 1
+            self._last_used[idx] = self._clock
+            logger.debug("Semantic cache hit (similarity %.4f)", sims[idx])
+            return self._contexts[idx]
+
+    def put(self, embedding, context: str):
+        """
+        Store a context for a query embedding, evicting the least recently used entry when full.
+
+        Args:
+            embedding (numpy.ndarray): Query embedding.
+            context (str): Retrieved context for the query.
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            if self._size < self.capacity:
+                idx = self._size
+                self._size += 1
+            else:
+                idx = int(np.argmin(self._last_used))
+            self._vectors[idx] = vector
+            self._contexts[idx] = context
+            self._clock += 1
+            self._last_used[idx] = self._clock
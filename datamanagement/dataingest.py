@@ -1,7 +1,12 @@
 import sys
 import os
-import json
+import orjson
 from dotenv import load_dotenv
+try:
+    # Streams URL arrays item by item instead of materializing whole manifests
+    import ijson
+except ImportError:
+    ijson = None
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from db.mongo import MongoDBConn
@@ -11,21 +16,25 @@ load_dotenv(dotenv_path=r'datamanagement\core\.env')
 MONGO_URI = os.getenv("MONGO_URI")
 
 def load_urls(files):
-    seen = set()
-    all_urls = []
+    """
+    Load and de-duplicate URLs from JSON array files, keeping first-seen order.
+    Files ending in .jsonl hold one JSON string per line (see LinkCollector.save_links_jsonl).
+    """
+    unique = {}
     for file in files:
-        with open(file) as f:
-            for url in json.load(f):
-                if url not in seen:
-                    seen.add(url)
-                    all_urls.append(url)
-    return all_urls
+        with open(file, 'rb') as f:
+            if file.endswith('.jsonl'):
+                urls = (orjson.loads(line) for line in f if line.strip())
+            else:
+                urls = ijson.items(f, 'item') if ijson else orjson.loads(f.read())
+            unique.update(dict.fromkeys(urls))
+    return list(unique)
 
 if __name__ == "__main__":
     final_urls = load_urls(COMMUNITY_FILES)
     print(len(final_urls))
-    with open(WEBEX_FILE) as f:
-        webex_urls = json.load(f)
+    with open(WEBEX_FILE, 'rb') as f:
+        webex_urls = orjson.loads(f.read())
 
     print("Saving community threads...")
     community = MongoDBConn(
@@ -0,0 +1,54 @@
+"""
+Module: bloom.py
+
+Minimal Bloom filter for local membership pre-checks, e.g. before hitting MongoDB
+or to skip thread URLs collected by earlier scrapes. Filters can be saved to disk.
+"""
+import hashlib
+import math
+import struct
+
+# File header: bit count and hash count, both little-endian uint64
+_HEADER = struct.Struct("<QQ")
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over one blake2b digest.
+
+    Attributes:
+        size (int): Number of bits.
+        hash_count (int): Number of bit positions set per item.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def tofile(self, f):
+        """Write the filter to a binary file object."""
+        f.write(_HEADER.pack(self.size, self.hash_count))
+        f.write(self._bits)
+
+    @classmethod
+    def fromfile(cls, f) -> "BloomFilter":
+        """Read a filter written by tofile() from a binary file object."""
+        size, hash_count = _HEADER.unpack(f.read(_HEADER.size))
+        bloom = cls.__new__(cls)
+        bloom.size = size
+        bloom.hash_count = hash_count
+        bloom._bits = bytearray(f.read((size + 7) // 8))
+        return bloom
@@ -1,9 +1,52 @@
+from threading import Lock
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
+from pymongo import TEXT
+from pymongo.errors import CollectionInvalid, OperationFailure
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 from core.logger import setup_logger
 
 logger = setup_logger('db_base', 'datamanagement/log/db_base.log')
 
+# One MongoClient (connection pool and monitors) per URI for the whole process
+_CLIENTS = {}
+_CLIENTS_LOCK = Lock()
+
+def _get_client(uri: str) -> MongoClient:
+    """
+    Return the shared MongoClient for a URI, creating it on first use.
+
+    Args:
+        uri (str): MongoDB connection URI.
+
+    Returns:
+        MongoClient: Process-wide client for the URI.
+    """
+    with _CLIENTS_LOCK:
+        if uri not in _CLIENTS:
+            _CLIENTS[uri] = MongoClient(uri,
+                                        server_api=ServerApi('1'),
+                                        maxPoolSize=64,
+                                        retryWrites=True,
+                                        compressors='zstd,snappy,zlib',
+                                        zlibCompressionLevel=6)
+        return _CLIENTS[uri]
+
+# BSON vector (subtype 9) header: dtype byte followed by a padding byte
+_FLOAT32_VECTOR_HEADER = BinaryVectorDtype.FLOAT32.value + b"\x00"
+
+def pack_float32(vector) -> Binary:
+    """
+    Encode an embedding as a BSON float32 vector, the compact form $vectorSearch
+    accepts both for stored embeddings and for queryVector.
+
+    Builds the same bytes as Binary.from_vector, but with one numpy copy instead of
+    a per-element struct.pack.
+    """
+    raw = np.asarray(vector, dtype="<f4").tobytes()
+    return Binary(_FLOAT32_VECTOR_HEADER + raw, subtype=9)
+
 class DBBase:
     """
     Base class to manage MongoDB connections and collection operations.
@@ -22,10 +65,11 @@ class DBBase:
         """
         self.uri = loginurl
         try:
-            self.client = MongoClient(self.uri, server_api=ServerApi('1'))
+            self.client = _get_client(self.uri)
             self.database = self.client[database]
             self.collection_name = collection
             self.collection = self.database[self.collection_name]
+            self._exists_cache = None
             logger.info("Connected to MongoDB at %s, database '%s', collection '%s'",
                        self.uri, database, collection)
         except Exception as e:
@@ -45,11 +89,14 @@ class DBBase:
     def _collection_exists(self):
         """
         Check if the collection exists in the database.
+        Only the first call queries the server; the result is cached on the instance.
 
         Returns:
             bool: True if collection exists, False otherwise.
         """
-        return self.collection_name in self.database.list_collection_names()
+        if self._exists_cache is None:
+            self._exists_cache = bool(self.database.list_collection_names(filter={"name": self.collection_name}))
+        return self._exists_cache
 
     def _create_data(self):
         """
@@ -59,11 +106,36 @@ class DBBase:
             pymongo.collection.Collection: The newly created collection.
         """
         db = self.database
-        db.create_collection(self.collection_name)
+        try:
+            db.create_collection(self.collection_name)
+        except CollectionInvalid:
+            logger.info("Collection '%s' already exists.", self.collection_name)
+        self._exists_cache = True
         return self.mongo_collection
 
+    def _ensure_indexes(self):
+        """
+        Create the indexes used by ingest and retrieval; no-op if they already exist.
+
+        - (thread_url, kind): existence checks and per-thread reads of one chunk kind;
+          its thread_url prefix also serves plain thread_url queries.
+        - chunk_hash: embedding reuse across ingests.
+        - response_chunk text index: $text sparse search. MongoDB picks it implicitly
+          ($text queries cannot be hinted) and allows only one per collection.
+
+        For a sharded cluster, shard on {"thread_url": "hashed"} so a thread's chunks
+        stay together while ingest spreads evenly across shards.
+        """
+        self.mongo_collection.create_index([("thread_url", 1), ("kind", 1)])
+        self.mongo_collection.create_index("chunk_hash", sparse=True)
+        try:
+            self.mongo_collection.create_index([("response_chunk", TEXT)], name="response_chunk_text")
+        except OperationFailure as e:
+            logger.warning("Text index not created (another text index may exist): %s", e)
+
     def _delete_data(self):
         """
         Drop (delete) the collection from the database.
         """
         self.mongo_collection.drop()
+        self._exists_cache = False
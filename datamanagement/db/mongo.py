@@ -1,20 +1,96 @@
-import glob
+import os
+import queue
+import struct
+import threading
+from datetime import timedelta
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import chain, islice
+import numpy as np
 import pymongo.errors
-from langchain_community.document_loaders import PyPDFLoader
+from bson.binary import Binary
+from bson.objectid import ObjectId
+from pymongo.write_concern import WriteConcern
+import pypdfium2 as pdfium
 from core.embedding import ChunkAndEmbed
 from core.pdfembeddings import PDFEmbed
-from core.logger import setup_logger
-from db.db_base import DBBase
+from core.embedding_model import EmbeddingModel
+from core.logger import init_worker_logging, setup_logger
+from db.bloom import BloomFilter
+from db.db_base import DBBase, pack_float32
+from scraping.bulk import scrape_many
 
 logger = setup_logger('mongodb_conn', 'datamanagement/log/mongodb_conn.log')
 
+def _pack_int8(vector) -> dict:
+    """
+    Quantize an embedding to int8 with a per-vector scale.
+
+    Args:
+        vector (list[float]): Embedding to quantize.
+
+    Returns:
+        dict: {"scale": float, "q": bson.Binary} holding the int8 bytes;
+        dequantize with np.frombuffer(q, np.int8) * scale.
+    """
+    arr = np.asarray(vector, dtype=np.float32)
+    scale = float(np.max(np.abs(arr))) / 127 or 1.0
+    return {"scale": scale, "q": Binary((arr / scale).round().astype(np.int8).tobytes())}
+
+# Saved URL filters, one file per database and collection; reused across runs
+URL_FILTER_DIR = os.getenv("URL_FILTER_DIR", "./url_filter")
+# Saved filter header: _id watermark, distinct URLs added, capacity
+_FILTER_HEADER = struct.Struct("<12sQQ")
+# On load, documents from this long before the watermark are re-read too,
+# so ObjectIds from clients with skewed clocks are not missed
+_FILTER_REFRESH_OVERLAP = timedelta(hours=1)
+# Distinct thread_url values, read with a DISTINCT_SCAN of the (thread_url, kind) index
+_DISTINCT_URLS = [{"$sort": {"thread_url": 1}}, {"$group": {"_id": "$thread_url"}}]
+
+def _load_pdf(pdf_path):
+    """
+    Load a PDF and split it into query text (first page) and response text (remaining pages).
+    Runs in a loader process: PDFium is not thread-safe, so each process has its own instance.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        tuple[str, str] | None: (query_text, response_text), or None if the PDF has no usable text.
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range().strip())
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    if not pages:
+        logger.warning("No content in PDF: %s", pdf_path)
+        return None
+    query_text = pages[0]
+    response_text = "\n\n".join(pages[1:])
+
+    if not query_text or not response_text:
+        logger.warning("Skipping %s: missing query or response text", pdf_path)
+        return None
+    return query_text, response_text
+
 class MongoDBConn(DBBase):
     """
     MongoDB connection handler for inserting chunked and embedded documents into MongoDB.
 
     Extends DBBase for MongoDB connection and collection handling.
     Uses ChunkAndEmbed to generate text chunks and embeddings.
+    Documents are buffered across URLs and written in unacknowledged batches of INSERT_BATCH.
     """
+    INSERT_BATCH = 100
+    INGEST_WORKERS = 16
+    INGEST_WINDOW = INGEST_WORKERS * 2
+    PDF_LOAD_WORKERS = 4
+
     def __init__(self, loginurl,
                  source=None,
                  database='', collection='',
@@ -29,11 +105,18 @@ class MongoDBConn(DBBase):
             weburl (list[str], optional): List of URLs to process.
             database (str): MongoDB database name.
             collection (str): MongoDB collection name.
-            verbose (bool, optional): If True, enables print/log output.
+            verbose (bool, optional): Passed to the chunk embedders for extra logging.
         """
         super().__init__(loginurl, database, collection)
         self.source = source
         self.verbose = verbose
+        # Ingest writes are fire-and-forget; reads keep the default write concern
+        self._insert_coll = self.collection.with_options(write_concern=WriteConcern(w=0))
+        self._buffer = []
+        self._known_urls = None
+        self._filter_mark = None
+        self._filter_count = 0
+        self._filter_capacity = 0
         logger.info("MongoDBConn initialized for source %s.", self.source)
 
 
@@ -45,7 +128,13 @@ class MongoDBConn(DBBase):
                        response_embeddings
                        ):
         """
-        Insert chunk-embedding document pairs into MongoDB collection.
+        Queue one document per chunk for batched insertion into MongoDB.
+
+        Query and response chunks are stored as separate documents tagged with
+        `kind` and linked by thread_url, rather than as every query/response pair.
+        Response embeddings are stored as float32 BSON vectors for $vectorSearch;
+        query embeddings are not searched and are stored as int8 with a scale.
+        Response documents carry a `chunk_hash` so later ingests can reuse their embeddings.
 
         Args:
             url (str): Thread URL for the chunks.
@@ -54,114 +143,330 @@ class MongoDBConn(DBBase):
             response_chunks (List[str]): List of response text chunks.
             response_embeddings (List[List[float]]): Corresponding embeddings for response chunks.
         """
-        docs = []
-        for _, (q_chunk, q_emb) in enumerate(zip(query_chunks, query_embeddings)):
-            for _, (r_chunk, r_emb) in enumerate(zip(response_chunks, response_embeddings)):
-                docs.append({
-                    "thread_url": url,
-                    "source": self.source,
-                    "query_chunk": q_chunk,
-                    "query_embedding": q_emb,
-                    "response_chunk": r_chunk,
-                    "response_embedding": r_emb,
-                })
-        if docs:
-            try:
-                self.mongo_collection.insert_many(docs)
-                logger.info("Inserted %d documents for URL: %s", len(docs), url)
-                if self.verbose:
-                    print(f"Inserted {len(docs)} documents for: {url}")
-            except pymongo.errors.PyMongoError as e:
-                logger.error("Failed to insert documents for %s: %s", url, e)
-                if self.verbose:
-                    print(f"Failed to insert documents for {url}: {e}")
+        docs = [
+            {"thread_url": url, "source": self.source, "kind": "query",
+             "query_chunk": q_chunk, "query_embedding": _pack_int8(q_emb)}
+            for q_chunk, q_emb in zip(query_chunks, query_embeddings)
+        ]
+        cache = EmbeddingModel.get_instance().embedding_cache
+        docs += [
+            {"thread_url": url, "source": self.source, "kind": "response",
+             "chunk_hash": cache.key(r_chunk),
+             "response_chunk": r_chunk, "response_embedding": pack_float32(r_emb)}
+            for r_chunk, r_emb in zip(response_chunks, response_embeddings)
+        ]
+        if self._known_urls is not None and url not in self._known_urls:
+            self._known_urls.add(url)
+            self._filter_count += 1
+        self._buffer.extend(docs)
+        logger.info("Queued %d documents for URL: %s", len(docs), url)
+        while len(self._buffer) >= self.INSERT_BATCH:
+            self._write_batch(self._buffer[:self.INSERT_BATCH])
+            del self._buffer[:self.INSERT_BATCH]
+
+    def _write_batch(self, docs):
+        try:
+            # bypass_document_validation is rejected for unacknowledged writes
+            self._insert_coll.insert_many(docs, ordered=False)
+            logger.info("Sent batch of %d documents (unacknowledged)", len(docs))
+        except pymongo.errors.PyMongoError as e:
+            logger.error("Failed to insert batch of %d documents: %s", len(docs), e)
+
+    def flush(self):
+        """
+        Write any buffered documents that did not fill a complete batch.
+        """
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self._buffer = []
+
+    def _stored_embeddings(self, keys) -> dict:
+        """
+        Fetch embeddings already stored for chunk hashes.
+
+        Only response documents are used, since their float32 vectors are lossless.
+
+        Args:
+            keys (List[str]): Chunk hash keys from the embedding cache.
+
+        Returns:
+            dict: Mapping of chunk hash to embedding vector.
+        """
+        cursor = self.mongo_collection.find(
+            {"chunk_hash": {"$in": keys}, "kind": "response"},
+            {"_id": 0, "chunk_hash": 1, "response_embedding": 1}
+        )
+        stored = {doc["chunk_hash"]: np.asarray(doc["response_embedding"].as_vector().data, dtype=np.float32)
+                  for doc in cursor}
+        logger.debug("Reused %d of %d chunk embeddings from MongoDB", len(stored), len(keys))
+        return stored
+
+    def _url_filter_path(self) -> str:
+        return os.path.join(URL_FILTER_DIR, f"{self.database.name}.{self.collection_name}.bloom")
+
+    def _url_filter(self) -> BloomFilter:
+        """
+        Bloom filter of every thread_url in the collection.
+
+        The filter saved by the previous run is loaded and topped up with documents
+        inserted since its watermark. It is rebuilt from the distinct URLs when
+        there is no saved filter or it has outgrown its capacity.
+
+        Returns:
+            BloomFilter: Filter with no false negatives for stored URLs.
+        """
+        if self._known_urls is None and not self._load_url_filter():
+            self._build_url_filter()
+        return self._known_urls
+
+    def _build_url_filter(self):
+        latest = self.mongo_collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        counted = list(self.mongo_collection.aggregate(_DISTINCT_URLS + [{"$count": "n"}]))
+        distinct = counted[0]["n"] if counted else 0
+        # Headroom for later runs before the false-positive rate degrades
+        capacity = max(2 * distinct, 1 << 16)
+        known = BloomFilter(capacity=capacity)
+        for doc in self.mongo_collection.aggregate(_DISTINCT_URLS):
+            known.add(doc["_id"])
+        self._known_urls = known
+        self._filter_mark = latest["_id"] if latest else ObjectId(bytes(12))
+        self._filter_count = distinct
+        self._filter_capacity = capacity
+        logger.info("Built URL Bloom filter from %d distinct URLs", distinct)
+
+    def _load_url_filter(self) -> bool:
+        """
+        Load the saved URL filter and add URLs stored since it was saved.
+
+        Returns:
+            bool: False if there is no usable saved filter and it must be rebuilt.
+        """
+        try:
+            with open(self._url_filter_path(), "rb") as f:
+                raw_mark, count, capacity = _FILTER_HEADER.unpack(f.read(_FILTER_HEADER.size))
+                known = BloomFilter.fromfile(f)
+        except (OSError, struct.error) as e:
+            logger.info("No saved URL Bloom filter loaded: %s", e)
+            return False
+        mark = ObjectId(raw_mark)
+        since = mark.generation_time - _FILTER_REFRESH_OVERLAP
+        query = {"_id": {"$gte": ObjectId.from_datetime(since)}} if since.timestamp() > 0 else {}
+        added = 0
+        for doc in self.mongo_collection.find(query, {"_id": 1, "thread_url": 1}):
+            mark = max(mark, doc["_id"])
+            url = doc.get("thread_url")
+            if url and url not in known:
+                known.add(url)
+                added += 1
+        count += added
+        if count > capacity:
+            logger.info("Saved URL Bloom filter is over capacity (%d > %d); rebuilding", count, capacity)
+            return False
+        self._known_urls = known
+        self._filter_mark = mark
+        self._filter_count = count
+        self._filter_capacity = capacity
+        logger.info("Loaded URL Bloom filter; added %d URLs stored since it was saved", added)
+        return True
+
+    def _save_url_filter(self):
+        """
+        Save the URL filter for the next run; written to a temporary file and renamed into place.
+        """
+        if self._known_urls is None:
+            return
+        os.makedirs(URL_FILTER_DIR, exist_ok=True)
+        path = self._url_filter_path()
+        with open(path + ".tmp", "wb") as f:
+            f.write(_FILTER_HEADER.pack(self._filter_mark.binary, self._filter_count, self._filter_capacity))
+            self._known_urls.tofile(f)
+        os.replace(path + ".tmp", path)
+        logger.info("Saved URL Bloom filter to %s", path)
+
+    def _existing_urls(self, urls) -> set:
+        """
+        Return the subset of urls that already have documents in the collection.
+
+        URLs are first checked against a local Bloom filter; only possible hits
+        are confirmed with one indexed distinct query.
+
+        Args:
+            urls (Iterable[str]): Thread URLs or PDF paths to check.
+
+        Returns:
+            set: URLs already present in the collection.
+        """
+        known = self._url_filter()
+        candidates = [url for url in urls if url in known]
+        if not candidates:
+            return set()
+        return set(self.mongo_collection.distinct("thread_url", {"thread_url": {"$in": candidates}}))
+
+    def _missing(self, paths) -> list:
+        """
+        Return the URLs or PDF paths not yet stored, in input order.
+
+        Args:
+            paths (List[str]): Thread URLs or PDF paths to check.
+
+        Returns:
+            list: Entries that still need to be ingested.
+        """
+        existing = self._existing_urls(paths)
+        for path in existing:
+            logger.info("Already exists in collection, skipping: %s", path)
+        return [path for path in paths if path not in existing]
 
     def save_data_to_mongo_web(self, weburl: list):
         """
         Main method to save data to MongoDB.
 
         - Checks if collection exists; creates if missing.
-        - Iterates over URLs and processes each if not already present.
-        - For each URL, scrapes and generates embeddings and chunks,
-          then inserts them into MongoDB.
+        - Skips URLs already present in the collection.
+        - Scrapes the remaining URLs with scraping.bulk.scrape_many and embeds them
+          on a thread pool, inserting each result into MongoDB as it completes.
         """
         if not self._collection_exists():
             self._create_data()
             logger.info("Collection '%s' created.", self.collection_name)
+        self._ensure_indexes()
 
         if not weburl:
             logger.warning("No URLs provided to save_data_to_mongo.")
-            if self.verbose:
-                print("No URLs provided to save_data_to_mongo.")
             return
 
-        for url in weburl:
-            try:
-                if self.mongo_collection.find_one({"thread_url": url}):
-                    logger.info("URL already exists in collection, skipping: %s", url)
-                    if self.verbose:
-                        print(f"URL already exists. Skipping: {url}")
+        missing = self._missing(weburl)
+
+        # Pages are fetched on threads and parsed in processes (scraping.bulk); embedding
+        # overlaps across URLs and inserts stay on this thread. At most INGEST_WINDOW
+        # pages wait for embedding, so results don't pile up in memory.
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.INGEST_WORKERS) as executor:
+            for url, scraped in scrape_many(self.source, missing):
+                if isinstance(scraped, Exception):
+                    logger.error("Scraping failed for %s: %s", url, scraped)
                     continue
-                chunk_embed = ChunkAndEmbed(self.source, url, verbose=self.verbose)
-                query_embeddings, response_embeddings, query_chunks, response_chunks = chunk_embed.generate_embedding()
+                futures[executor.submit(self._process_url, url, scraped)] = url
+                if len(futures) >= self.INGEST_WINDOW:
+                    self._insert_finished(futures, FIRST_COMPLETED)
+            self._insert_finished(futures, ALL_COMPLETED)
+        self.flush()
+        self._save_url_filter()
+
+    def _insert_finished(self, futures, return_when):
+        """
+        Wait for embedding futures and insert the results of those that finished.
+
+        Args:
+            futures (dict): Pending futures mapped to their URL; finished ones are removed.
+            return_when (str): FIRST_COMPLETED or ALL_COMPLETED, as for concurrent.futures.wait.
+        """
+        done, _ = wait(futures, return_when=return_when)
+        for future in done:
+            url = futures.pop(future)
+            try:
+                query_embeddings, response_embeddings, query_chunks, response_chunks = future.result()
                 self._insert_chunks(url, query_chunks,
                                     query_embeddings,
                                     response_chunks,
                                     response_embeddings)
             except pymongo.errors.PyMongoError as e:
                 logger.error("MongoDB error for %s: %s", url, e)
-                if self.verbose:
-                    print(f"MongoDB error for {url}: {e}")
             except (ValueError, TypeError) as e:
                 logger.error("Data processing error for %s: %s", url, e)
-                if self.verbose:
-                    print(f"Data processing error for {url}: {e}")
+
+    def _process_url(self, url, scraped):
+        """
+        Chunk and embed the scraped text of a URL.
+
+        Args:
+            url (str): Thread URL the text was scraped from.
+            scraped (tuple): (query_text, response_text) from the scraper.
+
+        Returns:
+            tuple: (query_embeddings, response_embeddings, query_chunks, response_chunks)
+        """
+        query_text, response_text = scraped
+        if not query_text or not response_text:
+            raise ValueError("Scraping returned empty content.")
+        chunk_embed = ChunkAndEmbed(self.source, url, verbose=self.verbose,
+                                    embedding_lookup=self._stored_embeddings)
+        return chunk_embed.generate_embedding(query_text, response_text)
 
     def save_to_mongo_pdf(self, source_folder):
         if not self._collection_exists():
             self._create_data()
             logger.info("Collection '%s' created.", self.collection_name)
+        self._ensure_indexes()
 
-        pdf_files = glob.glob(f"{source_folder}\\*.pdf")
+        with os.scandir(source_folder) as entries:
+            pdf_files = [e.path for e in entries if e.is_file() and e.name.lower().endswith('.pdf')]
         if not pdf_files:
             logger.warning("No PDF files found in %s", source_folder)
-            if self.verbose:
-                print(f"No PDF files found in {source_folder}")
             return
         
-        for pdf_path in pdf_files:
+        missing = self._missing(pdf_files)
+
+        # Three-stage pipeline: loader processes -> embedder thread -> inserts on this thread.
+        # Each stage hands over exactly one item per PDF; bounded queues cap memory.
+        load_q = queue.Queue(maxsize=8)
+        embed_q = queue.Queue(maxsize=8)
+
+        def load():
+            pending = iter(missing)
+            futures = {}
             try:
-                if self.mongo_collection.find_one({"thread_url": pdf_path}):
-                    logger.info("PDF already exists in collection, skipping: %s", pdf_path)
-                    if self.verbose:
-                        print(f"PDF already exists, skipping: {pdf_path}")
-                    continue
+                with ProcessPoolExecutor(max_workers=self.PDF_LOAD_WORKERS,
+                                         initializer=init_worker_logging) as loaders:
+                    for pdf_path in islice(pending, self.PDF_LOAD_WORKERS * 2):
+                        futures[loaders.submit(_load_pdf, pdf_path)] = pdf_path
+                    while futures:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            pdf_path = futures.pop(future)
+                            try:
+                                load_q.put((pdf_path, future.result()))
+                            except Exception as e:
+                                load_q.put((pdf_path, e))
+                        for pdf_path in islice(pending, len(done)):
+                            futures[loaders.submit(_load_pdf, pdf_path)] = pdf_path
+            except Exception as e:
+                # The pool is unusable; report the remaining PDFs so the later stages don't wait for them
+                logger.error("PDF loader pool failed: %s", e)
+                for pdf_path in chain(futures.values(), pending):
+                    load_q.put((pdf_path, e))
 
-                loader = PyPDFLoader(pdf_path)
-                pages = loader.load()
-                if not pages:
-                    logger.warning("No content in PDF: %s", pdf_path)
+        def embed():
+            for _ in missing:
+                pdf_path, texts = load_q.get()
+                if texts is None or isinstance(texts, Exception):
+                    embed_q.put((pdf_path, texts))
                     continue
-                query_text = pages[0].page_content.strip()
-                response_text = ""
-                if len(pages) > 1:
-                    response_text = "\n\n".join(p.page_content.strip() for p in pages[1:])
+                try:
+                    embedder = PDFEmbed(source=self.source, url=pdf_path, verbose=self.verbose,
+                                        embedding_lookup=self._stored_embeddings)
+                    embed_q.put((pdf_path, embedder.generate_embedding(query=texts[0], response_text=texts[1])))
+                except Exception as e:
+                    embed_q.put((pdf_path, e))
 
-                if not query_text or not response_text:
-                    logger.warning("Skipping %s: missing query or response text", pdf_path)
-                    continue
-                embedder = PDFEmbed(source=self.source, url=pdf_path, verbose=self.verbose)
-                query_embs, response_embs, query_chunks, response_chunks = embedder.generate_embedding(
-                    query=query_text,
-                    response_text=response_text
-                )
+        loader_thread = threading.Thread(target=load, daemon=True)
+        embedder_thread = threading.Thread(target=embed, daemon=True)
+        loader_thread.start()
+        embedder_thread.start()
+        for _ in missing:
+            pdf_path, result = embed_q.get()
+            if result is None:
+                continue
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                query_embs, response_embs, query_chunks, response_chunks = result
                 self._insert_chunks(pdf_path, query_chunks, query_embs, response_chunks, response_embs)
-
             except pymongo.errors.PyMongoError as e:
                 logger.error("MongoDB error for %s: %s", pdf_path, e)
-                if self.verbose:
-                    print(f"MongoDB error for {pdf_path}: {e}")
             except Exception as e:
                 logger.error("Error processing PDF %s: %s", pdf_path, e)
-                if self.verbose:
-                    print(f"Error processing PDF {pdf_path}: {e}")
+        embedder_thread.join()
+        loader_thread.join()
+        self.flush()
+        self._save_url_filter()
@@ -15,23 +15,47 @@ Usage Example:
 
 Assumptions:
     - MongoDB is configured with a vector index on the "response_embedding" field for $vectorSearch queries.
-    - Documents in the collection must include the fields: "thread_url", "query_chunk", "response_chunk".
+    - Documents hold one chunk each, linked by "thread_url": query chunks carry "query_chunk",
+      response chunks carry "response_chunk" and "response_embedding". Only response chunks are retrieved.
     - A text index exists for $text-based sparse search (e.g., on "response_chunk").
 
 Notes:
     - Integrates with embedding and scraping modules.
     - Thread-safe for model operations using locks.
-    - Embedding caching prevents redundant computation per query.
+    - Query embeddings are cached in the shared bounded LRU + on-disk embedding cache,
+      so frequent queries are not re-embedded after a restart.
     - Combine vector, sparse, and hybrid retrieval paths for optimal RAG recall and precision.
 """
-from typing import List, Dict, Any
+import threading
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Literal
+from pymongo.errors import OperationFailure
 from core.querychunking import ChunkEmbedRank
-from db.db_base import DBBase
+from db.db_base import DBBase, pack_float32
 from core.embedding_model import EmbeddingModel
+from core.batching import MicroBatcher
 from core.logger import setup_logger
 
 logger = setup_logger('vector_search', 'datamanagement/log/vector_search.log')
 
+# Query vectors expire from the on-disk cache after a week
+QUERY_EMBEDDING_TTL = 7 * 24 * 3600
+
+# Short, ambiguous queries get a broader ANN search
+SHORT_QUERY_WORDS = 3
+SHORT_QUERY_CANDIDATES = 200
+
+# Reranking is skipped when the best vector hit scores above this and leads the next one by the margin
+RERANK_CONFIDENT_SCORE = 0.9
+RERANK_CONFIDENT_MARGIN = 0.1
+
+# Chunk text beyond this many characters is dropped before reranking
+RERANK_MAX_CHARS = 2000
+
+# Background workers that warm the query embedding cache (see VectorSearch.prefetch_embedding)
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="embed-prefetch")
+
 class VectorSearch(DBBase):
     """
     Unified vector, sparse, and hybrid document retriever with reranking for MongoDB RAG pipelines.
@@ -45,15 +69,25 @@ class VectorSearch(DBBase):
         top_k_vector (int): Max results from vector search.
         top_k_rerank (int): Number of top results to retain after reranking.
         top_k_sparse (int): Max results from sparse full-text search.
+        num_candidates (int): Candidates considered by $vectorSearch before the limit.
+        top_k_candidates (int): Max deduplicated hybrid results passed to the reranker.
+        rerank_mode (str): When hybrid search runs the cross-encoder: "auto", "always" or "never".
+        rerank_batch_size (int): Pairs scored per cross-encoder batch.
         embedder (ChunkEmbedRank): Helper for query embedding.
-        model (CrossEncoder): Cross-encoder for chunk reranking.
+        model (CrossEncoder): Cross-encoder for chunk reranking (int8 ONNX when available), loaded on first use.
         model_lock (threading.Lock): Ensures thread safety for model predictions.
-        _embedding_cache (dict): Cache for query embeddings.
+        _embedding_cache (EmbeddingCache): Shared, model-namespaced cache for query embeddings.
+        _inflight (dict): Embeddings being computed, keyed by cache key, shared by concurrent callers.
+        _embed_batcher (MicroBatcher): Coalesces query embeddings across concurrent searches.
+        _rerank_batcher (MicroBatcher): Coalesces cross-encoder predictions across concurrent searches.
     """
     def __init__(self, loginurl,
                  database='', collection='',
                  top_k_vector: int = 50, top_k_rerank: int = 5,
-                 top_k_sparse: int = 20, verbose=True
+                 top_k_sparse: int = 20, num_candidates: int = 100,
+                 top_k_candidates: int = 50,
+                 rerank_mode: Literal["auto", "always", "never"] = "auto",
+                 verbose=True
                  ):
         """
         Initialize the search instance with MongoDB connection and RAG retrieval configuration.
@@ -65,6 +99,11 @@ class VectorSearch(DBBase):
             top_k_vector (int, optional): Max results for vector search. Defaults to 50.
             top_k_rerank (int, optional): Max results after reranking. Defaults to 5.
             top_k_sparse (int, optional): Max results for $text sparse search. Defaults to 20.
+            num_candidates (int, optional): ANN candidates considered by $vectorSearch. Defaults to 100;
+                queries shorter than SHORT_QUERY_WORDS words use SHORT_QUERY_CANDIDATES instead.
+            top_k_candidates (int, optional): Max deduplicated chunks passed to the reranker. Defaults to 50.
+            rerank_mode (str, optional): "always" or "never" rerank hybrid results; "auto" skips the
+                cross-encoder for easy queries. Defaults to "auto".
             verbose (bool, optional): Enable verbose console logging. Defaults to True.
         """
         super().__init__(loginurl, database, collection)
@@ -72,37 +111,82 @@ class VectorSearch(DBBase):
         self.top_k_vector = top_k_vector
         self.top_k_rerank = top_k_rerank
         self.top_k_sparse = top_k_sparse
+        self.num_candidates = num_candidates
+        self.top_k_candidates = top_k_candidates
+        self.rerank_mode = rerank_mode
+        self.rerank_batch_size = 32
         self.embedder = ChunkEmbedRank()
-        model_wrapper = EmbeddingModel.get_instance()
-        self.model = model_wrapper.get_cross_encoder()
-        self.model_lock = model_wrapper.lock
-        self._embedding_cache = {}
+        self._model_wrapper = EmbeddingModel.get_instance()
+        self.model_lock = self._model_wrapper.lock
+        self._embedding_cache = self._model_wrapper.embedding_cache
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Concurrent searches share one embedder / cross-encoder call per few-ms window
+        self._embed_batcher = MicroBatcher(self.embedder.generate_embeddings, name="query-embed")
+        self._rerank_batcher = MicroBatcher(self._predict_batch, name="rerank")
+
+    @property
+    def model(self):
+        return self._model_wrapper.get_cross_encoder()
 
     def get_embedded_query(self, query: str):
         """
         Returns the embedding vector for the input query, using cache if available.
+        Concurrent calls for the same uncached query share a single embedder call.
 
         Args:
             query (str): Input search query.
 
         Returns:
-            list[float]: Query embedding vector.
+            numpy.ndarray: Query embedding vector.
         """
-        if query in self._embedding_cache:
+        key = self._embedding_cache.key(query)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
             logger.debug("Using cached embedding for query: %s...", query[:50])
             if self.verbose:
                 print(f"Using cached embedding for query: {query[:50]}...")
-            return self._embedding_cache[query]
+            return cached
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        if not is_leader:
+            logger.debug("Waiting on in-flight embedding for query: %s...", query[:50])
+            return future.result()
         try:
-            embedding = self.embedder.generate_embedding(query)
-            self._embedding_cache[query] = embedding
+            if not query:
+                raise ValueError("query is empty")
+            embedding = self._embed_batcher.submit(query).result()
+            self._embedding_cache.set(key, embedding, expire=QUERY_EMBEDDING_TTL)
             logger.info("Generated embedding for query: %s (embedding shape: %d)", query[:50], len(embedding))
             if self.verbose:
                 print(f"Generated embedding for query: {query[:50]}...")
+            future.set_result(embedding)
             return embedding
         except Exception as e:
             logger.error("Error generating query embedding: %s", str(e))
-            raise ValueError(f"Error generating query embedding: {str(e)}") from e
+            error = ValueError(f"Error generating query embedding: {str(e)}")
+            future.set_exception(error)
+            raise error from e
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def prefetch_embedding(self, query: str) -> Future:
+        """
+        Embed a query in the background so a later search finds it cached,
+        e.g. while a /ragengine request waits for a worker (see apiservices.app).
+
+        Args:
+            query (str): Query to warm the cache for.
+
+        Returns:
+            Future: Resolves to the query embedding.
+        """
+        return _PREFETCH_POOL.submit(self.get_embedded_query, query)
 
     def _pipeline(self, query: str):
         """
@@ -115,12 +199,15 @@ class VectorSearch(DBBase):
             list[dict]: MongoDB aggregation pipeline for vector search.
         """
         embedded_query = self.get_embedded_query(query)
+        num_candidates = self.num_candidates
+        if len(query.split()) < SHORT_QUERY_WORDS:
+            num_candidates = max(num_candidates, SHORT_QUERY_CANDIDATES)
         pipeline = [
             {
                 "$vectorSearch": {
-                    "queryVector": embedded_query,
+                    "queryVector": pack_float32(embedded_query),
                     "path": "response_embedding",
-                    "numCandidates": 500,
+                    "numCandidates": num_candidates,
                     "limit": self.top_k_vector,
                     "index": "vector_index"  # Replace with actual index name
                 }
@@ -129,9 +216,10 @@ class VectorSearch(DBBase):
                 "$project": {
                     "_id": 0,
                     "thread_url": 1,
-                    "query_chunk": 1,
                     "response_chunk": 1,
-                    "score": {"$meta": "vectorSearchScore"}
+                    "score": {"$meta": "vectorSearchScore"},
+                    # Vector scores are in [0, 1]; the tag lets the rerank fast path tell them from text scores
+                    "retrieval": {"$literal": "vector"}
                 }
             }
         ]
@@ -179,15 +267,14 @@ class VectorSearch(DBBase):
             print(f"Performing sparse (text) search for query: {query[:50]}...")
         try:
             cursor = self.collection.find(
-                {"$text": {"$search": query}},
+                {"$text": {"$search": query}, "response_chunk": {"$exists": True}},
                 {
                     "_id": 0,
                     "thread_url": 1,
-                    "query_chunk": 1,
                     "response_chunk": 1,
                     "score": {"$meta": "textScore"}
                 }
-            ).sort([("score", {"$meta": "textScore"})]).limit(top_k)
+            ).sort([("score", {"$meta": "textScore"})]).limit(top_k).batch_size(top_k)
             results = list(cursor)
             logger.info("Sparse search returned %d results for query: '%s'", len(results), query[:60])
             if not results and self.verbose:
@@ -198,6 +285,25 @@ class VectorSearch(DBBase):
             logger.error("Sparse search failed: %s", str(e))
             raise RuntimeError(f"Sparse (full-text) search failed: {str(e)}") from e
 
+    def _predict_batch(self, pair_lists):
+        """
+        Score the pairs of several rerank requests in one cross-encoder call.
+        Identical (query, chunk) pairs, e.g. boilerplate shared by several threads, are scored once.
+
+        Args:
+            pair_lists (list[list[tuple[str, str]]]): (query, chunk) pairs per request.
+
+        Returns:
+            list: Scores per request, aligned with its pairs.
+        """
+        unique = list(dict.fromkeys(pair for pairs in pair_lists for pair in pairs))
+        # Score pairs in length order so each batch pads to similar lengths
+        unique.sort(key=lambda pair: len(pair[1]))
+        with self.model_lock:
+            scores = self.model.predict(unique, batch_size=self.rerank_batch_size)
+        score_map = dict(zip(unique, scores))
+        return [[score_map[pair] for pair in pairs] for pairs in pair_lists]
+
     def rerank_results(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Rerank results using a cross-encoder model.
@@ -215,12 +321,12 @@ class VectorSearch(DBBase):
                 print("No results to rerank.")
             return []
         logger.info("Reranking %d results for query: '%s'", len(results), query[:60])
-        pairs = [(query, res["response_chunk"]) for res in results]
+        # The cross-encoder truncates to its max length anyway; cutting early bounds tokenization cost
+        pairs = [(query, res["response_chunk"][:RERANK_MAX_CHARS]) for res in results]
         if self.verbose:
             print(f"Reranking {len(results)} results...")
         try:
-            with self.model_lock:
-                scores = self.model.predict(pairs)
+            scores = self._rerank_batcher.submit(pairs).result()
             for res, score in zip(results, scores):
                 res['rerank_score'] = score
             ranked = sorted(results, key=lambda x: x["rerank_score"], reverse=True)
@@ -230,44 +336,184 @@ class VectorSearch(DBBase):
             logger.error("Reranking failed: %s", str(e))
             raise RuntimeError(f"Reranking failed: {str(e)}") from e
 
-    def hybrid_search(self, query: str) -> List[Dict[str, Any]]:
+    def _candidate_caps(self):
+        """
+        Split `top_k_candidates` between the two retrieval sources. Each source is
+        capped on its own, since vector and text scores are on different scales.
+
+        Returns:
+            tuple[int, int]: (vector threads, text threads) kept as candidates.
+        """
+        text_cap = min(self.top_k_sparse, self.top_k_candidates // 2)
+        return self.top_k_candidates - text_cap, text_cap
+
+    @staticmethod
+    def _best_per_thread(limit: int):
+        """
+        Aggregation stages keeping the highest-scoring chunk per thread, best threads first.
+
+        Args:
+            limit (int): Max threads kept.
+
+        Returns:
+            list[dict]: Pipeline stages.
+        """
+        return [
+            {"$match": {"thread_url": {"$nin": [None, ""]}}},
+            {"$sort": {"score": -1}},
+            {"$group": {"_id": "$thread_url", "doc": {"$first": "$$ROOT"}}},
+            {"$replaceRoot": {"newRoot": "$doc"}},
+            {"$sort": {"score": -1}},
+            {"$limit": limit}
+        ]
+
+    def _hybrid_pipeline(self, query: str):
+        """
+        Constructs a single aggregation that runs vector search, unions in the $text
+        results and keeps one chunk per thread server-side.
+
+        Each branch is deduplicated and capped on its own score scale; a thread found
+        by both keeps its vector hit. Results come back vector hits first, then text hits.
+
+        Args:
+            query (str): Query string.
+
+        Returns:
+            list[dict]: MongoDB aggregation pipeline for hybrid search.
+        """
+        vector_cap, text_cap = self._candidate_caps()
+        pipeline = self._pipeline(query) + self._best_per_thread(vector_cap)
+        pipeline += [
+            {
+                "$unionWith": {
+                    "coll": self.collection.name,
+                    "pipeline": [
+                        {"$match": {"$text": {"$search": query}, "response_chunk": {"$exists": True}}},
+                        {"$sort": {"score": {"$meta": "textScore"}}},
+                        {"$limit": self.top_k_sparse},
+                        {
+                            "$project": {
+                                "_id": 0,
+                                "thread_url": 1,
+                                "response_chunk": 1,
+                                "score": {"$meta": "textScore"}
+                            }
+                        },
+                        *self._best_per_thread(text_cap)
+                    ]
+                }
+            },
+            # "vector" sorts above a missing tag, so scores are only compared within a source
+            {"$sort": {"retrieval": -1, "score": -1}},
+            {"$group": {"_id": "$thread_url", "doc": {"$first": "$$ROOT"}}},
+            {"$replaceRoot": {"newRoot": "$doc"}},
+            {"$sort": {"retrieval": -1, "score": -1}}
+        ]
+        return pipeline
+
+    def _separate_hybrid(self, query: str) -> List[Dict[str, Any]]:
         """
-        Hybrid search: combine vector and sparse search results, deduplicate by 'thread_url',
-        keep only the highest-scoring chunk per thread, then rerank the unique chunks.
+        Client-side hybrid retrieval for deployments where the fused aggregation is
+        rejected: run both searches concurrently and dedup by thread in Python,
+        with the same per-source caps as the fused pipeline.
 
         Args:
             query (str): Search query.
 
         Returns:
-            List[Dict[str, Any]]: Top reranked candidate chunks per unique thread.
+            List[Dict[str, Any]]: One chunk per unique thread, vector hits first.
         """
-        logger.info("Hybrid search started for query: '%s'", query[:60])
-        if self.verbose:
-            print(f"Running hybrid search for query: {query[:50]}...")
-        vector_results = self.similarity_search(query)
-        sparse_results = self.sparse_search(query)
+        # Both searches are independent Mongo round-trips, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            vector_future = pool.submit(self.similarity_search, query)
+            sparse_future = pool.submit(self.sparse_search, query)
+            vector_results, sparse_results = vector_future.result(), sparse_future.result()
         logger.debug("Vector results: %d, Sparse results: %d", len(vector_results), len(sparse_results))
 
-        # Collect highest-scored chunk per thread_url, considering both sources
+        vector_cap, text_cap = self._candidate_caps()
         best_per_thread = {}
+        for results, cap in ((vector_results, vector_cap), (sparse_results, text_cap)):
+            # Sorted by descending score, the first chunk seen for a thread is its best one
+            source_best = {}
+            for res in sorted(results, key=lambda r: r.get("score", 0), reverse=True):
+                thread_url = res.get("thread_url")
+                if thread_url:
+                    source_best.setdefault(thread_url, res)
+            # Vector hits are merged first, so they win threads found by both
+            for thread_url, res in islice(source_best.items(), cap):
+                best_per_thread.setdefault(thread_url, res)
+
+        return list(best_per_thread.values())
+
+    def _needs_rerank(self, results: List[Dict[str, Any]]) -> bool:
+        """
+        Decide whether hybrid results are worth a cross-encoder pass.
+        In "auto" mode reranking is skipped when every result is kept anyway,
+        or when the top vector hit is confident and clearly ahead of the runner-up.
 
-        def get_score(res):
-            return res.get("rerank_score", res.get("score", 0))
+        Args:
+            results (List[Dict[str, Any]]): Deduplicated hybrid results.
+
+        Returns:
+            bool: True if rerank_results should run.
+        """
+        if self.rerank_mode != "auto":
+            return self.rerank_mode == "always"
+        if len(results) <= self.top_k_rerank:
+            return False
+        vector_scores = sorted((res["score"] for res in results if res.get("retrieval") == "vector"),
+                               reverse=True)
+        if not vector_scores or vector_scores[0] <= RERANK_CONFIDENT_SCORE:
+            return True
+        runner_up = vector_scores[1] if len(vector_scores) > 1 else 0
+        return vector_scores[0] - runner_up <= RERANK_CONFIDENT_MARGIN
+
+    @staticmethod
+    def _first_stage_order(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Order hybrid results without the cross-encoder: vector hits by score, then text hits by score.
+        Vector scores lie in [0, 1] while textScore is unbounded, so the two scales are never compared.
 
-        for res in vector_results + sparse_results:
-            thread_url = res.get("thread_url")
-            score = get_score(res)
-            if thread_url:
-                if (
-                    thread_url not in best_per_thread
-                    or get_score(best_per_thread[thread_url]) < score
-                ):
-                    best_per_thread[thread_url] = res
+        Args:
+            results (List[Dict[str, Any]]): Deduplicated hybrid results.
+
+        Returns:
+            List[Dict[str, Any]]: Results in first-stage order.
+        """
+        return sorted(results,
+                      key=lambda r: (r.get("retrieval") == "vector", r.get("score", 0)),
+                      reverse=True)
+
+    def hybrid_search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Hybrid search: combine vector and sparse search results in one aggregation,
+        keep one chunk per 'thread_url' (its vector hit if it has one), then rerank up to
+        `top_k_candidates` unique chunks, capped per retrieval source. Easy queries skip the
+        rerank and return vector hits ahead of text hits (see `rerank_mode`).
+        Falls back to two concurrent searches if the server rejects the fused pipeline.
+
+        Args:
+            query (str): Search query.
+
+        Returns:
+            List[Dict[str, Any]]: Top reranked candidate chunks per unique thread.
+        """
+        logger.info("Hybrid search started for query: '%s'", query[:60])
+        if self.verbose:
+            print(f"Running hybrid search for query: {query[:50]}...")
+        try:
+            combined_results = list(self.collection.aggregate(self._hybrid_pipeline(query)))
+        except OperationFailure as e:
+            logger.warning("Fused hybrid aggregation failed, running separate searches: %s", e)
+            combined_results = self._separate_hybrid(query)
 
-        combined_results = list(best_per_thread.values())
         logger.info("Hybrid search deduplicated to %d unique threads.", len(combined_results))
-        reranked = self.rerank_results(query, combined_results)
-        logger.info("Hybrid search reranking complete for query: '%s'", query[:60])
+        if self._needs_rerank(combined_results):
+            reranked = self.rerank_results(query, combined_results)
+            logger.info("Hybrid search reranking complete for query: '%s'", query[:60])
+        else:
+            reranked = self._first_stage_order(combined_results)[:self.top_k_rerank]
+            logger.info("Hybrid search skipped reranking for query: '%s'", query[:60])
         logger.debug("Hybrid search threads considered: %s", [res.get("thread_url") for res in combined_results])
         if self.verbose:
             print(
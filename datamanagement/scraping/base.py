@@ -5,9 +5,11 @@ Defines an abstract base class for all scraper implementations.
 Handles common scraper initialization and provides a utility method
 for HTML content retrieval via URLAccess.
 
-Subclasses must implement the scrape() method to extract relevant data.
+Subclasses must implement the parse() method to extract relevant data from a parsed page;
+scrape() fetches the page and parses it.
 """
 from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup
 from scraping.url_access import URLAccess
 from core.logger import setup_logger
 
@@ -35,28 +37,52 @@ class BaseScraper(ABC):
 
     def _get_soup(self):
         """
-        Retrieves and returns the BeautifulSoup content of the target URL.
+        Retrieves the target URL and returns it parsed by build_document().
 
         Returns:
-            BeautifulSoup: Parsed HTML content.
+            Parsed HTML content (BeautifulSoup unless the subclass overrides build_document).
 
         Raises:
             Exception: If content retrieval fails.
         """
         try:
             logger.debug(f"Fetching content for URL {self.url}")
-            content = URLAccess(self.source).content(self.url)
+            html = URLAccess(self.source).fetch_raw(self.url)
             logger.info(f"Content successfully fetched for URL {self.url}")
-            return content
         except Exception as e:
             logger.error(f"Failed to get content for URL {self.url}: {e}")
             raise
+        return self.build_document(html)
 
+    def build_document(self, html):
+        """
+        Parses raw HTML into the document type parse() expects.
+
+        Args:
+            html (str): Raw HTML source.
+
+        Returns:
+            BeautifulSoup: Parsed HTML content.
+        """
+        return BeautifulSoup(html, 'lxml')
 
-    @abstractmethod
     def scrape(self):
         """
-        Abstract method to be implemented by subclasses to parse and extract data from the page.
+        Fetches the target URL and extracts data from it.
+
+        Returns:
+            tuple(str or None, str or None): A tuple of (query_text, response_text)
+        """
+        return self.parse(self._get_soup())
+
+    @abstractmethod
+    def parse(self, soup):
+        """
+        Abstract method to be implemented by subclasses to extract data from an already parsed page.
+        Must not fetch anything, so pages fetched elsewhere can be parsed in worker processes.
+
+        Args:
+            soup: Parsed HTML content of self.url, as returned by build_document().
 
         Raises:
             NotImplementedError: If the method is not implemented by subclass.
@@ -0,0 +1,74 @@
+"""
+Module: bulk.py
+
+Bulk scraping driver for many URLs of one source. Fetching is network I/O and runs on
+a thread pool; HTML parsing is CPU-bound, holds the GIL, and runs on a process pool.
+Only the URL and raw HTML cross the process boundary, never scraper or session objects.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, wait
+from itertools import islice
+from core.factory import ScraperFactory
+from scraping.url_access import URLAccess
+from core.logger import init_worker_logging, setup_logger
+
+logger = setup_logger('bulk_scraper', 'log/bulk_scraper.log')
+
+def parse_html(source: str, url: str, html: str):
+    """
+    Parse a fetched page with the scraper registered for source.
+
+    Args:
+        source (str): Source identifier, e.g. 'community' or 'webex'.
+        url (str): URL the HTML was fetched from.
+        html (str): Raw HTML source.
+
+    Returns:
+        tuple(str or None, str or None): A tuple of (query_text, response_text)
+    """
+    scraper = ScraperFactory.get_scraper(source, url)
+    return scraper.parse(scraper.build_document(html))
+
+def scrape_many(source: str, urls, fetch_workers: int = 32, parse_workers: int = None):
+    """
+    Fetch and parse many pages. Each page is handed to the parse pool as soon as
+    its fetch completes; parsed results are yielded in completion order.
+    At most 2 * fetch_workers pages are being fetched or parsed at any time,
+    so memory stays flat however many URLs are passed.
+
+    Args:
+        source (str): Source identifier.
+        urls (Iterable[str]): Pages to scrape.
+        fetch_workers (int): Threads issuing HTTP requests.
+        parse_workers (int, optional): Parser processes. Defaults to os.cpu_count().
+
+    Yields:
+        tuple: (url, (query_text, response_text)) or (url, Exception) for pages that failed.
+    """
+    access = URLAccess(source)
+    pending = iter(urls)
+    window = fetch_workers * 2
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count(),
+                                initializer=init_worker_logging) as parse_pool:
+        fetches = {fetch_pool.submit(access.fetch_raw, url): url for url in islice(pending, window)}
+        parses = {}
+        while fetches or parses:
+            done, _ = wait([*fetches, *parses], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    url = fetches.pop(future)
+                    try:
+                        parses[parse_pool.submit(parse_html, source, url, future.result())] = url
+                    except Exception as e:
+                        logger.error("Fetching %s failed: %s", url, e)
+                        yield url, e
+                else:
+                    url = parses.pop(future)
+                    try:
+                        yield url, future.result()
+                    except Exception as e:
+                        logger.error("Parsing %s failed: %s", url, e)
+                        yield url, e
+            for url in islice(pending, window - len(fetches) - len(parses)):
+                fetches[fetch_pool.submit(access.fetch_raw, url)] = url
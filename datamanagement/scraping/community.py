@@ -17,32 +17,40 @@ class CommunityScraper(BaseScraper):
         - Query: The first message body text or page title fallback.
         - Response: Accepted solution message if present; otherwise concatenates next 5 message bodies.
     """
-    def scrape(self):
+    ACCEPTED_CLASS = 'lia-message-body-accepted-solution-checkmark'
+
+    def parse(self, soup):
         """
-        Scrapes the community page to retrieve the main query and corresponding response.
+        Parses the community page to retrieve the main query and corresponding response.
+
+        Args:
+            soup (BeautifulSoup): Parsed HTML content of the page.
 
         Returns:
             tuple(str or None, str or None): A tuple of (query_text, response_text)
         """
         try:
-            soup = self._get_soup()
-            message_bodies = soup.select('.lia-message-body-content')
+            message_bodies = soup.find_all(class_='lia-message-body-content')
             query = message_bodies[0].get_text(strip=True) if message_bodies else None
 
             if not query or len(query.strip()) <= 1:
-                title_elem = soup.select_one('title')
+                title_elem = soup.title
                 query = title_elem.get_text(strip=True) if title_elem else "No title"
             
             logger.info(f"Extracted query text (length {len(query) if query else 0}) from {self.url}")
 
-            accepted_solution = soup.select_one('.lia-message-body-accepted-solution-checkmark .lia-message-body-content')
+            # The accepted solution is one of the message bodies already found, nested under the checkmark
+            accepted_solution = next(
+                (body for body in message_bodies if body.find_parent(class_=self.ACCEPTED_CLASS)),
+                None
+            )
             if accepted_solution:
                 response = accepted_solution.get_text(strip=True)
                 logger.info("Accepted solution found and extracted.")
             else:
                 if len(message_bodies) > 1:
-                    next_bodies = [body.get_text(strip=True) for body in message_bodies[1:6]]
-                    response = "\n\n".join(next_bodies) if next_bodies else None
+                    next_bodies = message_bodies[1:6]
+                    response = "\n\n".join(body.get_text(strip=True) for body in next_bodies)
                     logger.info(f"No accepted solution; extracted {len(next_bodies)} follow-up messages.")
                 else:
                     response = None
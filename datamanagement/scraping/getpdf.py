@@ -1,26 +1,42 @@
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 class CollectPDFs():
-    
-    def scrape(self, urls, downloads_folder: str):
-        os.makedirs(downloads_folder, exist_ok=True)
-        for url in urls:
-            pdf_url = url.rstrip().replace(".html", ".pdf")
-            filename = os.path.basename(pdf_url)
+    # Downloads are pure network I/O, so threads sharing one keep-alive session suffice
+    MAX_WORKERS = 16
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=32,
+                                                   pool_maxsize=32,
+                                                   max_retries=Retry(total=3, backoff_factor=0.3)))
 
-            try:
-                print(f"Downloading: {pdf_url}")
-                r = requests.get(pdf_url, stream=True, timeout=60)
+    def _fetch_one(self, url, downloads_folder: str):
+        pdf_url = url.rstrip().replace(".html", ".pdf")
+        filename = os.path.basename(pdf_url)
+
+        try:
+            print(f"Downloading: {pdf_url}")
+            with self.session.get(pdf_url, stream=True, timeout=60) as r:
                 r.raise_for_status()
 
                 if "application/pdf" in r.headers.get("Content-Type", ""):
                     filepath = os.path.join(downloads_folder, filename)
+                    r.raw.decode_content = True
                     with open(filepath, "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
+                        shutil.copyfileobj(r.raw, f, length=1 << 20)
                     print(f"Saved: {filepath}")
                 else:
                     print(f"Skipped (Not PDF): {pdf_url}")
 
-            except Exception as e:
-                print(f"Failed: {pdf_url} ({e})")
+        except Exception as e:
+            print(f"Failed: {pdf_url} ({e})")
+
+    def scrape(self, urls, downloads_folder: str):
+        os.makedirs(downloads_folder, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            list(pool.map(lambda url: self._fetch_one(url, downloads_folder), urls))
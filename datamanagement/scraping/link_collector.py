@@ -6,18 +6,36 @@ and cookie banner acceptance. Collects unique thread URLs for further processing
 
 Logs progress and errors to a dedicated log file.
 """
-import time
-import logging
+import copy
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import orjson
+import requests
+from lxml import etree
+import lxml.html
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from core.logger import setup_logger
+from db.bloom import BloomFilter
+from scraping import sslbypass
 
 logger = setup_logger('link_collector', 'log/link_collector.log')
 
+def _class_test(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Same links as EXTRACT_HREFS_JS, read from the HTML fragments returned by the 'Load More' endpoint
+_SOLVED_HREF_XPATH = etree.XPath(
+    f"//i[{_class_test('custom-thread-solved')}]/ancestor::h3[1]/descendant::a[1]/@href")
+_UNSOLVED_HREF_XPATH = etree.XPath(
+    f"//article[{_class_test('custom-message-tile')} and {_class_test('custom-thread-unread')}]"
+    "/descendant::h3[1]/descendant::a[1]/@href")
+
 class LinkCollector:
     """
     Scrapes community forum pages to collect solved and unsolved thread URLs.
@@ -31,34 +49,66 @@ class LinkCollector:
         driver (webdriver.Chrome): Selenium WebDriver instance.
         wait (WebDriverWait): Selenium explicit wait object.
         urls (set): Set of unique thread URLs collected.
+        prior (BloomFilter or frozenset): URLs collected by earlier runs; see known_filter() for saving.
     """
     LOAD_MORE_SELECTOR = ".lia-link-navigation.load-more-button.lia-button.lia-button-primary"
     SOLVED_ICON_SELECTOR = "i.custom-thread-solved"
     COOKIE_CLOSE_SELECTOR = ".onetrust-close-btn-handler.onetrust-close-btn-ui.banner-close-button.ot-close-icon"
     UNSOLVED_ARTICLE_SELECTOR = "article.custom-message-tile.custom-thread-unread"
+    TILE_SELECTOR = "article.custom-message-tile"
+    BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.woff*', '*.css',
+                    '*google-analytics*', '*doubleclick*']
 
-    def __init__(self, sources, website):
+    def __init__(self, sources, website, remote_url=None, known_urls=None):
         """
         Initialize scraper with Selenium driver and parameters.
 
         Args:
             sources (str): Source identifier, e.g., 'community'.
             website (str): Community forum home URL.
+            remote_url (str, optional): Selenium Grid hub URL, e.g. "http://localhost:4444/wd/hub".
+                Uses a local Chrome when not given.
+            known_urls (Iterable[str] or BloomFilter, optional): Thread URLs collected by earlier runs,
+                e.g. a filter loaded with BloomFilter.fromfile. These are not collected again.
         """
         self.website = website
         self.source = sources
-        self.driver = webdriver.Chrome(options=self._default_options())
-        self.wait = WebDriverWait(self.driver, 5)
+        if remote_url:
+            self.driver = webdriver.Remote(command_executor=remote_url, options=self._default_options())
+        else:
+            self.driver = webdriver.Chrome(options=self._default_options())
+        self._block_heavy_resources()
+        self.wait = WebDriverWait(self.driver, 5, poll_frequency=0.1)
         self.urls = set()
+        self._extracted = (0, 0)
+        # Only a filter passed in is probabilistic; URL lists and this run's URLs are checked exactly
+        if isinstance(known_urls, BloomFilter):
+            self.prior = known_urls
+        else:
+            self.prior = frozenset(known_urls or ())
         logger.info(f"LinkCollector initialized for website: {website}")
 
     def _default_options(self):
         options = Options()
-        # options.add_argument("--headless")
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
-        options.add_argument("start-maximized")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--window-size=1920,1080")
+        # Only the DOM is needed; don't wait for images, fonts and other subresources
+        options.page_load_strategy = 'eager'
+        # Network events are read once to find the XHR behind 'Load More'
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         return options
 
+    def _block_heavy_resources(self):
+        """Blocks images, fonts, stylesheets and trackers via CDP (local Chrome only)."""
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.BLOCKED_URLS})
+
     def _accept_cookies(self):
         """Attempts to close cookie banner if present."""
         try:
@@ -70,7 +120,6 @@ class LinkCollector:
     def _scroll_to_element(self, element):
         """Scrolls viewport to the specified element."""
         self.driver.execute_script("arguments[0].scrollIntoView();", element)
-        time.sleep(0.4)
 
     def _click_load_more(self):
         """
@@ -85,63 +134,191 @@ class LinkCollector:
             if 'disabled' in load_more.get_attribute("class"):
                 logger.info("Load More button is disabled; no additional pages.")
                 return False
+            prev_count = len(self.driver.find_elements(By.CSS_SELECTOR, self.TILE_SELECTOR))
             self.driver.execute_script("arguments[0].click();", load_more)
-            time.sleep(0.4)
+            # Wait for the new page of threads to be appended instead of sleeping a fixed time
+            self.wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, self.TILE_SELECTOR)) > prev_count)
             logger.info("Load More button clicked.")
             return True
         except TimeoutException:
             logger.warning("Load More button not found or timeout expired.")
             return False
 
-    def _extract_href_from_icon(self, icon):
+    # One script returns every thread link, instead of three WebDriver round-trips per element
+    # Elements before the given offsets were already extracted, so only newly appended rows are read
+    EXTRACT_HREFS_JS = """
+        const icons = document.querySelectorAll(arguments[0]);
+        const articles = document.querySelectorAll(arguments[1]);
+        const solved = Array.from(icons).slice(arguments[2])
+            .map(i => i.closest('h3')?.querySelector('a')?.href);
+        const unsolved = Array.from(articles).slice(arguments[3])
+            .map(a => a.querySelector('h3')?.querySelector('a')?.href);
+        return [icons.length, articles.length, solved.filter(Boolean), unsolved.filter(Boolean)];
+    """
+    # Links are extracted every EXTRACT_EVERY pages; pagination stops after STALL_WINDOWS
+    # extractions in a row where less than MIN_NEW_FRACTION of the links found are new
+    EXTRACT_EVERY = 10
+    STALL_WINDOWS = 3
+    MIN_NEW_FRACTION = 0.05
+    KNOWN_CAPACITY = 1_000_000
+
+    def _extract_hrefs(self):
         """
-        Extracts and stores URL from solved thread icon element.
+        Extracts and stores URLs of solved and unsolved (unread) threads appended since the last call.
 
-        Args:
-            icon (WebElement): Selenium element containing solved icon.
+        Returns:
+            tuple(int, int, list): Number of solved and unsolved links found, and the URLs not seen
+            before in this or an earlier run.
+        """
+        icon_count, article_count, solved, unsolved = self.driver.execute_script(
+            self.EXTRACT_HREFS_JS,
+            self.SOLVED_ICON_SELECTOR,
+            self.UNSOLVED_ARTICLE_SELECTOR,
+            self._extracted[0],
+            self._extracted[1]
+        )
+        self._extracted = (icon_count, article_count)
+        return len(solved), len(unsolved), self._record(solved + unsolved)
+
+    def _record(self, hrefs):
+        """Stores hrefs not seen before and returns them."""
+        new_urls = [href for href in dict.fromkeys(hrefs) if href not in self.urls and href not in self.prior]
+        self.urls.update(new_urls)
+        return new_urls
+
+    def known_filter(self):
+        """
+        Bloom filter of the URLs from earlier runs and this run, e.g. to save with tofile()
+        and pass as known_urls to the next run.
+
+        Returns:
+            BloomFilter: New filter; the one passed as known_urls is left unchanged.
+        """
+        if isinstance(self.prior, BloomFilter):
+            known = copy.deepcopy(self.prior)
+        else:
+            known = BloomFilter(capacity=max(self.KNOWN_CAPACITY, 2 * (len(self.prior) + len(self.urls))))
+            for url in self.prior:
+                known.add(url)
+        for url in self.urls:
+            known.add(url)
+        return known
+
+    # Page number in the 'Load More' request, e.g. ".../page/3" or "?page=3"
+    PAGE_PARAM_RE = re.compile(r'[?&/;]page[=/](\d+)', re.IGNORECASE)
+
+    def _capture_load_more_url(self):
+        """
+        Finds the XHR sent by the last 'Load More' click in Chrome's performance log.
+
+        Returns:
+            tuple(str, int, str) or None: URL prefix, page number and URL suffix around the page
+            number, or None if no paginated GET request was seen (e.g. no performance log on this driver).
         """
         try:
-            h3 = icon.find_element(By.XPATH, "./ancestor::h3")
-            a_tag = h3.find_element(By.TAG_NAME, "a")
-            href = a_tag.get_attribute("href")
-            if href:
-                self.urls.add(href)
-                logger.debug(f"Collected solved thread URL: {href}")
-        except Exception as e:
-            logger.error(f"Error extracting solved link: {e}")
+            entries = self.driver.get_log('performance')
+        except WebDriverException as e:
+            logger.warning(f"Performance log unavailable; paginating in the browser: {e}")
+            return None
+        for entry in reversed(entries):
+            message = orjson.loads(entry['message'])['message']
+            if message.get('method') != 'Network.requestWillBeSent':
+                continue
+            params = message['params']
+            if params.get('type') not in ('XHR', 'Fetch') or params['request']['method'] != 'GET':
+                continue
+            url = params['request']['url']
+            match = self.PAGE_PARAM_RE.search(url)
+            if match:
+                logger.info(f"Found Load More endpoint: {url}")
+                return url[:match.start(1)], int(match.group(1)), url[match.end(1):]
+        logger.info("No paginated Load More request found; paginating in the browser.")
+        return None
 
-    def _extract_href_from_unsolved_article(self, article):
+    def _http_session(self):
+        """Session carrying the browser's cookies and user agent, so the endpoint answers as it does in Chrome."""
+        session = sslbypass.get_legacy_session()
+        session.headers.update({
+            'User-Agent': self.driver.execute_script("return navigator.userAgent"),
+            'X-Requested-With': 'XMLHttpRequest',
+        })
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        return session
+
+    @staticmethod
+    def _response_html(response):
+        """Returns the HTML of a 'Load More' response, joining the markup strings of a JSON payload."""
+        if 'json' not in response.headers.get('Content-Type', ''):
+            return response.text
+        parts = []
+        stack = [orjson.loads(response.content)]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, str) and '<' in node:
+                parts.append(node)
+        return ''.join(parts)
+
+    def _iter_http_pages(self, endpoint, max_pages):
         """
-        Extracts and stores URL from an unsolved (unread) thread article element.
+        Requests the following pages from the 'Load More' endpoint directly, without rendering them.
 
         Args:
-            article (WebElement): Selenium element for unread thread.
+            endpoint (tuple): URL prefix, last page number and URL suffix from _capture_load_more_url.
+            max_pages (int): Max number of pages to request.
+
+        Yields:
+            tuple(int, int, list): Number of solved and unsolved links on the page, and the new URLs.
+            Stops at the first page without thread links.
+
+        Raises:
+            requests.RequestException: If a page request fails.
         """
-        try:
-            h3 = article.find_element(By.TAG_NAME, "h3")
-            a_tag = h3.find_element(By.TAG_NAME, "a")
-            href = a_tag.get_attribute("href")
-            if href:
-                self.urls.add(href)
-                logger.debug(f"Collected unsolved thread URL: {href}")
-        except Exception as e:
-            logger.error(f"Error extracting unsolved link: {e}")
+        prefix, page, suffix = endpoint
+        with self._http_session() as session:
+            for page in range(page + 1, page + 1 + max_pages):
+                url = f"{prefix}{page}{suffix}"
+                response = session.get(url, timeout=15)
+                response.raise_for_status()
+                html = self._response_html(response)
+                if not html.strip():
+                    return
+                tree = lxml.html.fromstring(html)
+                solved = [urljoin(url, href) for href in _SOLVED_HREF_XPATH(tree)]
+                unsolved = [urljoin(url, href) for href in _UNSOLVED_HREF_XPATH(tree)]
+                if not solved and not unsolved:
+                    return
+                logger.info(f"Fetched page {page} from the Load More endpoint.")
+                yield len(solved), len(unsolved), self._record(solved + unsolved)
 
-    def scrape_website_community(self, max_pages=100):
+    def iter_new_links(self, max_pages=100):
         """
-        Main method to scrape the community website for thread URLs.
+        Scrape the community website, yielding thread URLs as they are discovered.
+
+        After the first 'Load More' click, the following pages are requested from the endpoint
+        behind the button when it can be found. Pagination goes back to clicking if the endpoint
+        returns no thread links on its first page or fails part-way.
 
         Args:
             max_pages (int, optional): Max number of times to click 'Load More'. Defaults to 100.
 
-        Returns:
-            list: List of unique thread URLs collected.
+        Yields:
+            list: URLs not seen before, one batch per extraction window.
         """
         logger.info("Starting community site scrape...")
         self.driver.get(self.website)
         self._accept_cookies()
 
         pages_clicked = 0
+        # Pages already read over HTTP; clicking back through them does not count towards a stall
+        covered = 0
+        stalled = 0
+        solved_count = unsolved_count = 0
+        try_endpoint = True
         while pages_clicked < max_pages:
             try:
                 if not self._click_load_more():
@@ -152,23 +329,129 @@ class LinkCollector:
             except TimeoutException:
                 logger.warning("Load More button not found or timed out.")
                 break
+            if try_endpoint:
+                try_endpoint = False
+                endpoint = self._capture_load_more_url()
+                if endpoint:
+                    solved, unsolved, new_urls = self._extract_hrefs()
+                    solved_count += solved
+                    unsolved_count += unsolved
+                    if new_urls:
+                        yield new_urls
+                    http_pages = 0
+                    stall_pages = self.STALL_WINDOWS * self.EXTRACT_EVERY
+                    try:
+                        for solved, unsolved, new_urls in self._iter_http_pages(endpoint, max_pages - pages_clicked):
+                            http_pages += 1
+                            solved_count += solved
+                            unsolved_count += unsolved
+                            if new_urls:
+                                yield new_urls
+                            mostly_known = len(new_urls) < self.MIN_NEW_FRACTION * max(1, solved + unsolved)
+                            stalled = stalled + 1 if mostly_known else 0
+                            if stalled >= stall_pages:
+                                logger.info(f"Few new thread links in the last {stalled} pages; ending pagination.")
+                                break
+                    except (requests.RequestException, ValueError, etree.LxmlError) as e:
+                        logger.warning(f"Load More endpoint failed after {http_pages} pages; "
+                                       f"resuming pagination in the browser: {e}")
+                    else:
+                        if http_pages:
+                            break
+                        logger.info("Load More endpoint returned no thread links; paginating in the browser.")
+                    covered = pages_clicked + http_pages
+                    stalled = 0
+                    continue
+            if pages_clicked % self.EXTRACT_EVERY == 0:
+                solved, unsolved, new_urls = self._extract_hrefs()
+                solved_count += solved
+                unsolved_count += unsolved
+                if new_urls:
+                    yield new_urls
+                if pages_clicked <= covered:
+                    continue
+                mostly_known = len(new_urls) < self.MIN_NEW_FRACTION * max(1, solved + unsolved)
+                stalled = stalled + 1 if mostly_known else 0
+                if stalled >= self.STALL_WINDOWS:
+                    logger.info(f"Few new thread links in the last {stalled * self.EXTRACT_EVERY} pages; ending pagination.")
+                    break
 
-        solved_icons = self.driver.find_elements(By.CSS_SELECTOR,
-                                                 self.SOLVED_ICON_SELECTOR)
-        for icon in solved_icons:
-            self._extract_href_from_icon(icon)
+        solved, unsolved, new_urls = self._extract_hrefs()
+        solved_count += solved
+        unsolved_count += unsolved
+        if new_urls:
+            yield new_urls
+        logger.info(f"Collected {solved_count} solved and {unsolved_count} unsolved (unread-thread) links.")
+        logger.info(f"Total unique thread links collected: {len(self.urls)}")
 
-        unsolved_articles = self.driver.find_elements(By.CSS_SELECTOR,
-                                                      self.UNSOLVED_ARTICLE_SELECTOR)
-        for article in unsolved_articles:
-            self._extract_href_from_unsolved_article(article)
-        logger.info(f"Collected {len(unsolved_articles)} unsolved (unread-thread) links.")
+    def scrape_website_community(self, max_pages=100):
+        """
+        Main method to scrape the community website for thread URLs.
 
-        logger.info(f"Total unique thread links collected: {len(self.urls)}")
+        Args:
+            max_pages (int, optional): Max number of times to click 'Load More'. Defaults to 100.
+
+        Returns:
+            list: List of unique thread URLs collected.
+        """
+        for _ in self.iter_new_links(max_pages):
+            pass
         return list(self.urls)
 
+    def save_links_jsonl(self, filepath, max_pages=100):
+        """
+        Scrape the community website and append each discovered URL to a JSON Lines file.
+        Every batch is flushed as it arrives, so an interrupted run keeps what it found.
+
+        Args:
+            filepath (str): Output .jsonl path; one JSON string per line.
+            max_pages (int, optional): Max number of times to click 'Load More'. Defaults to 100.
+
+        Returns:
+            int: Number of URLs written.
+        """
+        written = 0
+        with open(filepath, 'ab') as f:
+            for new_urls in self.iter_new_links(max_pages):
+                f.writelines(orjson.dumps(url) + b"\n" for url in new_urls)
+                f.flush()
+                written += len(new_urls)
+        logger.info(f"Wrote {written} thread links to {filepath}")
+        return written
+
     def close(self):
         """Closes Selenium WebDriver cleanly."""
         if self.driver:
             self.driver.quit()
             logger.info("Selenium WebDriver closed.")
+
+def collect_links(sources, websites, max_pages=100, remote_url=None, max_workers=4):
+    """
+    Collect thread URLs from several entry pages in parallel, one browser session each.
+
+    With a Selenium Grid hub as remote_url, sessions are spread across grid nodes;
+    max_workers should not exceed the grid's total session slots.
+
+    Args:
+        sources (str): Source identifier, e.g., 'community'.
+        websites (list[str]): Entry URLs to shard the scrape by, e.g. URLAccess.base_urls['community'].
+        max_pages (int, optional): Max 'Load More' clicks per entry URL. Defaults to 100.
+        remote_url (str, optional): Selenium Grid hub URL. Defaults to local Chrome.
+        max_workers (int, optional): Concurrent browser sessions. Defaults to 4.
+
+    Returns:
+        list: Unique thread URLs across all entry pages.
+    """
+    def collect(website):
+        collector = LinkCollector(sources, website, remote_url=remote_url)
+        try:
+            return collector.scrape_website_community(max_pages)
+        finally:
+            collector.close()
+
+    urls = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for found in pool.map(collect, websites):
+            urls.update(found)
+    logger.info(f"Collected {len(urls)} unique thread links from {len(websites)} entry pages.")
+    return list(urls)
@@ -16,9 +16,10 @@ class CustomHttpAdapter (requests.adapters.HTTPAdapter):
             block=block, ssl_context=self.ssl_context)
 
 
-def get_legacy_session():
+def get_legacy_session(**adapter_kwargs):
+    # adapter_kwargs go to HTTPAdapter, e.g. pool_connections, pool_maxsize, max_retries
     ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
     ctx.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
     session = requests.session()
-    session.mount('https://', CustomHttpAdapter(ctx))
-    return session
\ No newline at end of file
+    session.mount('https://', CustomHttpAdapter(ctx, **adapter_kwargs))
+    return session
@@ -7,13 +7,57 @@ Parses links matching source-specific patterns and returns normalized absolute U
 Uses sslbypass module for legacy session handling to bypass SSL issues if needed.
 """
 import re
-from urllib.parse import urljoin
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from urllib3.util.retry import Retry
 from core.logger import setup_logger
 from scraping import sslbypass
 
 logger = setup_logger('url_access', 'log/url_access.log')
 
+_HREF_XPATH = etree.XPath('//a/@href')
+
+# Concurrent page fetches in URLAccess.linksparsed_many; stays below the session pool size
+FETCH_WORKERS = 16
+# Pages kept by fetch_raw's cache
+PAGE_CACHE_SIZE = 256
+
+# One keep-alive session per process, so repeated fetches to the same host skip the TLS handshake
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def _shared_session():
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = sslbypass.get_legacy_session(pool_connections=20,
+                                                    pool_maxsize=50,
+                                                    max_retries=Retry(total=3, backoff_factor=0.3))
+        return _SESSION
+
+# Raw HTML, not the parsed tree, is cached: strings are immutable, while soups get modified by callers.
+# Keyed by session as well, so pages fetched with different cookies or adapters don't mix; failures aren't cached.
+@lru_cache(maxsize=PAGE_CACHE_SIZE)
+def _fetch_cached(session, url: str) -> str:
+    try:
+        with session.get(url, timeout=15) as response:
+            if response.status_code == 200 and 'text/html' in response.headers.get('Content-Type', ''):
+                logger.info(f"Successfully fetched HTML content from {url}")
+                return response.text
+            else:
+                msg = f"Failed retrieving HTML from {url} " \
+                      f"(Status code: {response.status_code}, Content-Type: {response.headers.get('Content-Type')})"
+                logger.error(msg)
+                raise ConnectionError(msg)
+    except Exception as exc:
+        logger.error(f"Exception during HTTP GET for {url}: {exc}")
+        raise
+
 class URLAccess:
     """
     Accesses and parses URLs within the defined source namespaces.
@@ -39,6 +83,8 @@ class URLAccess:
         'community': r'^/c/en/us',
         'webex': r'^/en-us/(article/|[\w-]+$)'
     }
+    # Compiled once for all instances and pages
+    _href_res = {name: re.compile(pattern) for name, pattern in href_patterns.items()}
 
     def __init__(self, source: str):
         """
@@ -57,64 +103,100 @@ class URLAccess:
             raise ValueError(f"Unsupported source: {source}")
         self.source = source
         self.links = []
+        self._session = _shared_session()
+        self._base_set = frozenset(self.base_urls[source])
+        base = urlsplit(self.base_urls[source][0])
+        self._origin = f"{base.scheme}://{base.netloc}"
         logger.info(f"Initialized URLAccess for {source}")
 
-    def _fetch_html(self, url: str):
+    def fetch_raw(self, url: str) -> str:
         """
-        Uses sslbypass to get a session and fetch HTML content from self.url.
+        Fetch the HTML source of url over the shared legacy-SSL session without parsing it.
+        Pages are cached per session, so linksparsed and content on the same URL fetch it once.
 
         Returns:
-            BeautifulSoup: Parsed HTML using lxml or html.parser.
+            str: Raw HTML text.
 
         Raises:
             ConnectionError: For HTTP failures or non-HTML content.
         """
-        try:
-            session = sslbypass.get_legacy_session()
-            response = session.get(url)
-            if response.status_code == 200 and 'text/html' in response.headers.get('Content-Type', ''):
-                logger.info(f"Successfully fetched HTML content from {url}")
-                return BeautifulSoup(response.text, 'html.parser')
-            else:
-                msg = f"Failed retrieving HTML from {url} " \
-                      f"(Status code: {response.status_code}, Content-Type: {response.headers.get('Content-Type')})"
-                logger.error(msg)
-                raise ConnectionError(msg)
-        except Exception as exc:
-            logger.error(f"Exception during HTTP GET for {url}: {exc}")
-            raise
-
-    def _soup(self, url):
-        return self._fetch_html(url)
+        return _fetch_cached(self._session, url)
 
-    def linksparsed(self, url) -> list:
+    def _fetch_html(self, url: str):
         """
-        Parse and extract filtered absolute links from the fetched HTML content.
+        Fetch url and parse it.
 
         Returns:
-            list: Unique list of filtered absolute URLs related to the source context.
+            BeautifulSoup: Parsed HTML using lxml.
+
+        Raises:
+            ConnectionError: For HTTP failures or non-HTML content.
         """
-        soup = self._fetch_html(url)
+        return BeautifulSoup(self.fetch_raw(url), 'lxml')
+
+    def _soup(self, url):
+        return self._fetch_html(url)
+
+    def _parse_links(self, url, html) -> list:
         try:
+            # Only hrefs are needed, so read them straight off the lxml tree without building a soup
+            tree = lxml.html.fromstring(html)
             raw_links = []
             base_url = self.base_urls[self.source][0]
-            pattern = self.href_patterns[self.source]
-            for a_tag in soup.find_all('a', href=re.compile(pattern)):
-                href = a_tag.get('href')
-                if href:
-                    full_url = urljoin(base_url, href)
+            href_re = self._href_res[self.source]
+            origin = self._origin
+            for href in _HREF_XPATH(tree):
+                if href and href_re.search(href):
+                    # Root-relative hrefs (the common case) only need the origin prepended
+                    if href.startswith('/') and not href.startswith('//'):
+                        full_url = origin + href
+                    else:
+                        full_url = urljoin(base_url, href)
                     raw_links.append(full_url)
 
             # Deduplicate and remove base URLs themselves
-            all_links = list(set(filter(lambda link: link not in self.base_urls[self.source], raw_links)))
+            all_links = list(set(raw_links) - self._base_set)
 
-            self.links = all_links
             logger.info(f"Parsed {len(all_links)} unique links from {url}")
             return all_links
         except Exception as exc:
             logger.error(f"Failed during parsing links from {url}: {exc}")
             raise
 
+    def linksparsed(self, url) -> list:
+        """
+        Parse and extract filtered absolute links from the fetched HTML content.
+
+        Returns:
+            list: Unique list of filtered absolute URLs related to the source context.
+        """
+        self.links = self._parse_links(url, self.fetch_raw(url))
+        return self.links
+
+    def linksparsed_many(self, urls, max_workers: int = FETCH_WORKERS) -> dict:
+        """
+        Fetch several pages concurrently and extract their links.
+        Each page is parsed as soon as its fetch completes; pages that fail are logged and left out.
+
+        Args:
+            urls (Iterable[str]): Pages to fetch.
+            max_workers (int, optional): Concurrent fetches. Defaults to FETCH_WORKERS.
+
+        Returns:
+            dict: Mapping of page URL to its list of filtered absolute links.
+        """
+        links = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.fetch_raw, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    links[url] = self._parse_links(url, future.result())
+                except Exception as exc:
+                    logger.warning(f"Skipping {url}: {exc}")
+        logger.info(f"Parsed links from {len(links)} of {len(futures)} pages")
+        return links
+
     def content(self, url) -> BeautifulSoup:
         """
         Get the parsed BeautifulSoup HTML content.
@@ -5,12 +5,17 @@ Implements a scraper for Webex Help Center pages.
 Extracts the page title (used as a query) and concatenates all paragraph and list item texts as response.
 Depends on BaseScraper for shared web content access utilities.
 """
+import lxml.html
+from lxml import etree
 from scraping.base import BaseScraper
 from core.logger import setup_logger
 
 # Initialize logger for this module
 logger = setup_logger('webex_scraper', 'log/webex_scraper.log')
 
+# Paragraphs and list items in document order, compiled once
+_CONTENT_XPATH = etree.XPath('//p | //li')
+
 
 class WebexScraper(BaseScraper):
     """
@@ -21,27 +26,40 @@ class WebexScraper(BaseScraper):
         - Response: Concatenated visible text from paragraphs and list items.
     """
 
-    def scrape(self):
+    def build_document(self, html):
         """
-        Scrapes the Webex page content to retrieve a concise query and detailed response text.
+        Parses Help Center pages straight into an lxml tree; no BeautifulSoup objects are needed.
+
+        Args:
+            html (str): Raw HTML source.
+
+        Returns:
+            lxml.html.HtmlElement: Root of the parsed page.
+        """
+        return lxml.html.fromstring(html)
+
+    def parse(self, soup):
+        """
+        Parses the Webex page content to retrieve a concise query and detailed response text.
+
+        Args:
+            soup (lxml.html.HtmlElement): Parsed page from build_document().
 
         Returns:
             tuple(str or None, str or None): A tuple of (query_text, response_text)
         """
         try:
-            soup = self._get_soup()
-
             # Extract and clean the page title
-            title = soup.select_one("title")
+            title = soup.find(".//title")
             query = None
-            if title:
-                query = title.get_text(strip=True).replace(" - Webex Help Center", "")
+            if title is not None:
+                query = title.text_content().strip().replace(" - Webex Help Center", "")
             logger.info(f"Extracted query from title: '{query if query else 'None'}'")
 
             # Extract visible paragraph and list item texts
-            content_elements = soup.select('p, li')
-            content = [e.get_text(strip=True) for e in content_elements if e.get_text(strip=True)]
-            response = " ".join(content) if content else None
+            # Same text as BeautifulSoup get_text(strip=True): every text piece stripped, then concatenated
+            content = ("".join(text.strip() for text in e.itertext()) for e in _CONTENT_XPATH(soup))
+            response = " ".join(text for text in content if text) or None
             logger.info(f"Extracted response content length: {len(response) if response else 0}")
 
             return query, response
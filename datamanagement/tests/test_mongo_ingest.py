@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+
+import pytest
+
+mongo = pytest.importorskip("db.mongo")
+bulk = pytest.importorskip("pymongo.synchronous.bulk")
+
+
+class _StubConnection:
+    max_wire_version = 21
+
+
+def _conn(monkeypatch):
+    conn = mongo.MongoDBConn("mongodb://localhost:27017/?connect=false",
+                             source="webex", database="ingest_test", collection="docs")
+
+    @contextmanager
+    def conn_for_writes(session, operation):
+        yield _StubConnection()
+    monkeypatch.setattr(conn.client, "_conn_for_writes", conn_for_writes)
+    return conn
+
+
+def test_unacknowledged_batch_reaches_the_wire(monkeypatch):
+    sent = []
+    monkeypatch.setattr(bulk._Bulk, "execute_op_msg_no_results",
+                        lambda self, conn, generator: sent.extend(doc for run in generator for doc in run.ops))
+    errors = []
+    monkeypatch.setattr(mongo.logger, "error", lambda *args: errors.append(args))
+
+    conn = _conn(monkeypatch)
+    assert not conn._insert_coll.write_concern.acknowledged
+    conn._write_batch([{"thread_url": "u", "kind": "query"}, {"thread_url": "u", "kind": "response"}])
+
+    assert errors == []
+    assert [doc["kind"] for doc in sent] == ["query", "response"]
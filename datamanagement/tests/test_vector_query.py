@@ -0,0 +1,84 @@
+import pytest
+
+vector_query = pytest.importorskip("db.vector_query")
+VectorSearch = vector_query.VectorSearch
+
+
+class _FakeCollection:
+    def __init__(self, results):
+        self.results = results
+
+    def aggregate(self, pipeline):
+        return [dict(res) for res in self.results]
+
+
+def _searcher(results, top_k_rerank=2):
+    searcher = VectorSearch.__new__(VectorSearch)
+    searcher.verbose = False
+    searcher.rerank_mode = "auto"
+    searcher.top_k_rerank = top_k_rerank
+    searcher.collection = _FakeCollection(results)
+    searcher._hybrid_pipeline = lambda query: []
+
+    def no_rerank(query, results):
+        raise AssertionError("cross-encoder should be skipped")
+    searcher.rerank_results = no_rerank
+    return searcher
+
+
+def test_confident_vector_hit_ranks_above_text_hits():
+    results = [
+        {"thread_url": "text-a", "response_chunk": "a", "score": 7.3},
+        {"thread_url": "vec-a", "response_chunk": "b", "score": 0.95, "retrieval": "vector"},
+        {"thread_url": "text-b", "response_chunk": "c", "score": 3.1},
+        {"thread_url": "vec-b", "response_chunk": "d", "score": 0.5, "retrieval": "vector"},
+    ]
+    ranked = _searcher(results).hybrid_search("webex audio drops")
+    assert [res["thread_url"] for res in ranked] == ["vec-a", "vec-b"]
+
+
+def test_few_results_keep_vector_hits_first():
+    results = [
+        {"thread_url": "text-a", "response_chunk": "a", "score": 4.0},
+        {"thread_url": "vec-a", "response_chunk": "b", "score": 0.6, "retrieval": "vector"},
+    ]
+    ranked = _searcher(results).hybrid_search("webex")
+    assert [res["thread_url"] for res in ranked] == ["vec-a", "text-a"]
+
+
+def _separate_searcher(vector_results, text_results, top_k_candidates=4, top_k_sparse=2):
+    searcher = _searcher([])
+    searcher.top_k_candidates = top_k_candidates
+    searcher.top_k_sparse = top_k_sparse
+    searcher.similarity_search = lambda query: [dict(res) for res in vector_results]
+    searcher.sparse_search = lambda query: [dict(res) for res in text_results]
+    return searcher
+
+
+def test_thread_found_by_both_keeps_its_vector_hit():
+    searcher = _separate_searcher(
+        [{"thread_url": "both", "response_chunk": "v", "score": 0.9, "retrieval": "vector"}],
+        [{"thread_url": "both", "response_chunk": "t", "score": 8.5},
+         {"thread_url": "text-a", "response_chunk": "a", "score": 2.0}],
+    )
+    results = searcher._separate_hybrid("webex audio drops")
+    assert [(res["thread_url"], res.get("retrieval")) for res in results] == [("both", "vector"), ("text-a", None)]
+
+
+def test_candidate_cap_applies_per_source():
+    vector_hits = [{"thread_url": f"vec-{i}", "response_chunk": "v", "score": 0.9 - i / 10, "retrieval": "vector"}
+                   for i in range(5)]
+    text_hits = [{"thread_url": f"text-{i}", "response_chunk": "t", "score": 9.0 - i} for i in range(3)]
+    results = _separate_searcher(vector_hits, text_hits)._separate_hybrid("webex")
+    assert [res["thread_url"] for res in results] == ["vec-0", "vec-1", "text-0", "text-1"]
+
+
+def test_fused_pipeline_caps_and_merges_per_source():
+    searcher = _separate_searcher([], [])
+    searcher._pipeline = lambda query: []
+    searcher.collection.name = "docs"
+    pipeline = VectorSearch._hybrid_pipeline(searcher, "webex")
+    assert pipeline[5] == {"$limit": 2}
+    assert pipeline[6]["$unionWith"]["pipeline"][-1] == {"$limit": 2}
+    assert pipeline[7] == {"$sort": {"retrieval": -1, "score": -1}}
+    assert "$limit" not in pipeline[-1]